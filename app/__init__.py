@@ -18,30 +18,28 @@ def create_app():
     app.camera_lock = threading.Lock()
     app.camera_handler_instance = None
     
-    # Preview state
-    app.preview_thread = None
-    app.preview_active = threading.Event()
+    # Preview state (the producer thread itself lives in CameraHandler)
     app.preview_rate = 1.0  # Default FPS
     
     # Timelapse state
+    from app.routes.timelapse import TimelapseStatus
     app.timelapse_thread = None
     app.timelapse_active = threading.Event()
-    app.timelapse_status = {
-        "active": False, 
-        "message": "Idle", 
-        "count": 0, 
-        "total": 0, 
-        "folder": None
-    }
+    app.timelapse_status = TimelapseStatus()
+    app.timelapse_status_lock = threading.Lock()
+    # Condition (sharing the status lock) notified on every status change,
+    # so SSE clients wake only when there is something new to send
+    app.timelapse_status_cond = threading.Condition(app.timelapse_status_lock)
     
     # Register blueprints
-    from app.routes import main_bp, camera_bp, capture_bp, preview_bp, timelapse_bp
+    from app.routes import main_bp, camera_bp, capture_bp, preview_bp, timelapse_bp, files_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(camera_bp)
     app.register_blueprint(capture_bp)
     app.register_blueprint(preview_bp)
     app.register_blueprint(timelapse_bp)
+    app.register_blueprint(files_bp)
     
     # Initialize camera handler (with Flask 2.x compatible approach)
     from app.routes.camera import get_camera
@@ -12,8 +12,14 @@ OUTPUT_DIR = os.path.join(BASE_DIR, 'single_captures')
 # Directory for static files (like preview)
 STATIC_DIR = os.path.join(BASE_DIR, 'app', 'static')
 
-# Path for preview image
-PREVIEW_FILE_PATH = os.path.join(STATIC_DIR, 'previews', 'preview.jpg')
+# Path for preview image. Prefer tmpfs (/dev/shm): the preview loop rewrites
+# this file several times per second, and on a Pi that would otherwise be a
+# continuous write-read cycle through the SD card. Served via the
+# /api/preview/image route, so it does not need to live under static/.
+if os.path.isdir('/dev/shm'):
+    PREVIEW_FILE_PATH = os.path.join('/dev/shm', 'remote_camera_controller', 'preview.jpg')
+else:
+    PREVIEW_FILE_PATH = os.path.join(STATIC_DIR, 'previews', 'preview.jpg')
 
 # Ensure directories exist
 os.makedirs(os.path.dirname(PREVIEW_FILE_PATH), exist_ok=True)
@@ -5,6 +5,7 @@ camera_bp = Blueprint('camera', __name__, url_prefix='/api/camera')
 capture_bp = Blueprint('capture', __name__, url_prefix='/api/capture')
 preview_bp = Blueprint('preview', __name__, url_prefix='/api/preview')
 timelapse_bp = Blueprint('timelapse', __name__, url_prefix='/api/timelapse')
+files_bp = Blueprint('files', __name__, url_prefix='/api/files')
 
 # Create a separate blueprint for main routes
 main_bp = Blueprint('main', __name__)
@@ -41,4 +42,5 @@ def preview_image(filename):
 from app.routes.camera import *
 from app.routes.capture import *
 from app.routes.preview import *
-from app.routes.timelapse import *
\ No newline at end of file
+from app.routes.timelapse import *
+from app.routes.files import *
\ No newline at end of file
@@ -41,11 +41,19 @@ def get_camera_settings_api():
     """API endpoint to get configurable camera settings."""
     current_app.logger.debug("API request: /api/camera/settings")
     cam = get_camera()
-    
+
     if cam:
-        settings = cam.list_all_config()
+        # The settings page renders two levels (sections + their children),
+        # so the default shallow walk reads a fraction of the widget tree;
+        # deeper sections come back marked _lazy for the subtree endpoint.
+        # depth=0 keeps the full walk available for API consumers.
+        depth = request.args.get('depth', 2, type=int)
+        if depth <= 0:
+            settings = cam.list_all_config()
+        else:
+            settings = cam.list_config_tree(depth=depth)
         if settings is None:
-            current_app.logger.error("list_all_config() returned None.")
+            current_app.logger.error("Camera settings walk returned None.")
             return jsonify({"error": "Failed to retrieve settings from camera."}), 500
 
         # Debug log - limit log size if necessary
@@ -60,6 +68,25 @@ def get_camera_settings_api():
         current_app.logger.warning("Camera not available for /api/camera/settings request.")
         return jsonify({"error": "Camera not available."}), 503  # Service Unavailable
 
+@camera_bp.route('/settings/subtree', methods=['GET'])
+def get_camera_settings_subtree_api():
+    """API endpoint to expand one lazy section of the settings tree."""
+    path = request.args.get('path', '')
+    if not path:
+        return jsonify({"error": "Missing 'path' parameter."}), 400
+    current_app.logger.debug(f"API request: /api/camera/settings/subtree '{path}'")
+
+    cam = get_camera()
+    if cam:
+        subtree = cam.get_config_subtree(path)
+        if subtree is None:
+            return jsonify({"error": f"No settings section at '{path}'."}), 404
+        return jsonify(subtree)
+    else:
+        current_app.logger.warning("Camera not available for settings subtree request.")
+        return jsonify({"error": "Camera not available."}), 503
+
+
 @camera_bp.route('/setting/<path:setting_name>', methods=['POST'])
 def set_camera_setting_api(setting_name):
     """API endpoint to set a specific camera setting."""
@@ -5,6 +5,16 @@ from app.routes import capture_bp
 from app.routes.camera import get_camera
 from app.config import OUTPUT_DIR, BASE_DIR
 
+# Directories already proven to exist; lets burst captures skip the
+# makedirs syscall on every shot (nothing in the app removes these dirs).
+_known_dirs = set()
+
+def _ensure_dir(path):
+    """Creates `path` once and remembers it, so repeat calls cost a set lookup."""
+    if path not in _known_dirs:
+        os.makedirs(path, exist_ok=True)
+        _known_dirs.add(path)
+
 @capture_bp.route('/single', methods=['POST'])
 def capture_single_api():
     """API endpoint to trigger a single image capture."""
@@ -14,13 +24,20 @@ def capture_single_api():
     if cam:
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         capture_dir = OUTPUT_DIR
-        os.makedirs(capture_dir, exist_ok=True)
+        _ensure_dir(capture_dir)
         
         # Create a full file path for the captured image
         capture_file = os.path.join(capture_dir, f"{timestamp}.jpg")
         
         success, filepath = cam.capture_image(save_path=capture_file)
         if success and filepath:
+            # The response hands the client a path it may fetch immediately,
+            # so wait for the background writer to land the file first.
+            if not cam.flush_pending_saves():
+                return jsonify({
+                    "success": False,
+                    "message": "Capture downloaded but saving to disk failed. Check logs."
+                }), 500
             relative_path = os.path.relpath(filepath, BASE_DIR)
             return jsonify({
                 "success": True, 
@@ -0,0 +1,190 @@
+import os
+from flask import current_app, jsonify, request, send_file, Response, stream_with_context
+from werkzeug.http import http_date
+from app.routes import files_bp
+from app.config import BASE_DIR, OUTPUT_DIR, TIMELAPSE_DIR
+
+# Pre-resolved roots the file endpoints are allowed to serve from. Resolving
+# once at import (realpath + trailing separator) means each request needs a
+# single realpath plus one C-level startswith over the tuple, and symlink or
+# '..' tricks cannot escape the capture directories.
+_ALLOWED_ROOTS = tuple(
+    os.path.realpath(p) + os.sep for p in (OUTPUT_DIR, TIMELAPSE_DIR)
+)
+
+# Suffix tuple for the inline-image endpoint; str.endswith with a tuple is a
+# single C-level check, so no splitext or per-request list allocation.
+_IMG_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff')
+
+# Static extension -> MIME map so send_file doesn't fall back to
+# mimetypes.guess_type on every request. Covers everything the camera
+# produces; anything else downloads as an octet stream.
+_EXT_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.tiff': 'image/tiff',
+    '.arw': 'image/x-sony-arw',
+    '.dng': 'image/x-adobe-dng',
+    '.mp4': 'video/mp4',
+    '.zip': 'application/zip',
+}
+
+def _mimetype_for(path):
+    """Looks up the MIME type for a path from the static extension map."""
+    return _EXT_MIME.get(os.path.splitext(path)[1].lower(), 'application/octet-stream')
+
+def _weak_etag(st):
+    """Builds a weak ETag from a stat result (inode, size, mtime in ns)."""
+    return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+# Chunk size for streamed downloads; 1 MiB keeps syscall count low without
+# holding more than one chunk in memory per client.
+_STREAM_CHUNK = 1 << 20
+
+def _stream_file(path, chunk_size=_STREAM_CHUNK, offset=0, length=None):
+    """
+    Generator that yields a file in fixed-size chunks without buffering it
+    whole. offset/length bound the read for HTTP Range requests; length
+    None means to end of file.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        try:
+            # Hint the kernel to readahead aggressively for this sequential scan
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except (AttributeError, OSError):
+            pass
+        if offset:
+            f.seek(offset)
+        remaining = length
+        while True:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            if size == 0:
+                break
+            data = f.read(size)
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+        try:
+            # These bytes won't be read again; drop them from the page cache
+            # so a big download can't evict the capture pipeline's working set
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except (AttributeError, OSError):
+            pass
+
+def _resolve_requested_path(raw_path):
+    """Resolves a client-supplied path (relative to BASE_DIR) to an absolute path."""
+    if os.path.isabs(raw_path):
+        return os.path.realpath(raw_path)
+    return os.path.realpath(os.path.join(BASE_DIR, raw_path))
+
+def _validate_request_path(raw_path, require_image=False):
+    """
+    Validates a client-supplied path without raising.
+    Returns (None, absolute_path) on success or (http_status, error_message) on failure.
+    """
+    if not raw_path:
+        return 400, "Missing 'path' parameter."
+
+    path = _resolve_requested_path(raw_path)
+
+    # Only serve files from the managed capture directories
+    if not path.startswith(_ALLOWED_ROOTS):
+        current_app.logger.warning(f"Rejected file request outside allowed directories: {path}")
+        return 403, "Access denied."
+
+    if require_image and not path.lower().endswith(_IMG_EXTS):
+        return 400, "Not an image file."
+
+    if not os.path.isfile(path):
+        return 404, "File not found."
+
+    return None, path
+
+@files_bp.route('/image', methods=['GET'])
+def get_image_api():
+    """API endpoint to serve a captured image for inline display."""
+    status, result = _validate_request_path(request.args.get('path'), require_image=True)
+    if status is not None:
+        # Expected client errors: no exception raised, no traceback formatted
+        return jsonify({"error": result}), status
+    path = result
+
+    try:
+        st = os.stat(path)
+        # conditional=True makes Werkzeug honor Range / If-Modified-Since /
+        # If-None-Match, so revisits get 304s and partial fetches only
+        # transfer the missing bytes.
+        response = send_file(
+            path,
+            mimetype=_mimetype_for(path),
+            conditional=True,
+            etag=False,
+            last_modified=st.st_mtime
+        )
+        # Weak validator built from the stat we already hold; gallery
+        # revisits then get header-only 304s instead of full re-downloads
+        response.set_etag(_weak_etag(st), weak=True)
+        return response.make_conditional(request)
+    except Exception as e:
+        current_app.logger.error(f"Error serving image {path}: {e}", exc_info=True)
+        return jsonify({"error": "Failed to serve image."}), 500
+
+@files_bp.route('/download', methods=['GET'])
+def download_file_api():
+    """API endpoint to download a captured file (e.g. a timelapse RAW) as an attachment."""
+    status, result = _validate_request_path(request.args.get('path'))
+    if status is not None:
+        return jsonify({"error": result}), status
+    path = result
+
+    try:
+        st = os.stat(path)
+        etag = _weak_etag(st)
+
+        # Header-only 304 for revalidation hits: no file open, no body
+        # bytes. contains_weak is required here — plain membership does a
+        # strong comparison, which by definition never matches the weak
+        # validator this endpoint emits.
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers={'ETag': f'W/"{etag}"'})
+
+        mimetype = _mimetype_for(path)
+        headers = {
+            'Content-Disposition': f'attachment; filename="{os.path.basename(path)}"',
+            'ETag': f'W/"{etag}"',
+            'Last-Modified': http_date(st.st_mtime),
+            'Accept-Ranges': 'bytes',
+        }
+
+        # Honor Range so interrupted multi-GB RAW downloads can resume
+        # instead of restarting; an invalid Range header parses to None
+        # and gets the full file, per the RFC.
+        status_code = 200
+        offset, length = 0, None
+        if request.range is not None:
+            rng = request.range.range_for_length(st.st_size)
+            if rng is None:
+                headers['Content-Range'] = f'bytes */{st.st_size}'
+                return Response(status=416, headers=headers)
+            offset, end = rng
+            length = end - offset
+            status_code = 206
+            headers['Content-Range'] = f'bytes {offset}-{end - 1}/{st.st_size}'
+        headers['Content-Length'] = str(st.st_size if length is None else length)
+
+        # Stream in chunks so multi-GB RAW/sequence downloads never
+        # materialize in memory; Werkzeug forwards each chunk as produced.
+        return Response(
+            stream_with_context(_stream_file(path, offset=offset, length=length)),
+            status=status_code,
+            mimetype=mimetype,
+            headers=headers
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error serving download {path}: {e}", exc_info=True)
+        return jsonify({"error": "Failed to serve file."}), 500
@@ -1,32 +1,63 @@
 import os
 import datetime
+import json
 import threading
 import time
-from flask import current_app, jsonify, request, copy_current_request_context
+from dataclasses import dataclass, asdict
+from typing import Optional
+from flask import current_app, jsonify, request, copy_current_request_context, Response, stream_with_context
+from zipstream import ZipStream
 from app.routes import timelapse_bp
 from app.routes.camera import get_camera
 from app.config import TIMELAPSE_DIR
 
+@dataclass
+class TimelapseStatus:
+    """Shared timelapse progress state; guard all access with app.timelapse_status_lock."""
+    active: bool = False
+    message: str = "Idle"
+    count: int = 0
+    total: int = 0
+    folder: Optional[str] = None
+
+def _update_status(app, **fields):
+    """Applies field updates to the shared status atomically and wakes SSE listeners."""
+    with app.timelapse_status_cond:
+        for name, value in fields.items():
+            setattr(app.timelapse_status, name, value)
+        app.timelapse_status_cond.notify_all()
+
+def _sleep_until(stop_event, deadline):
+    """Waits until `deadline` (monotonic clock); returns True if cancelled meanwhile."""
+    return stop_event.wait(max(0, deadline - time.monotonic()))
+
 def run_timelapse(app, interval, count, format_override):
     """Background thread function for timelapse capture."""
     # Use the passed app instance instead of trying to get it from current_app
     logger = app.logger
     
     logger.info(f"Timelapse thread started. Interval: {interval}s, Count: {count}, Format: {format_override}")
-    
+
+    # Raise scheduling priority and pin off core 0 so Flask request threads
+    # don't preempt captures. Both need privileges/Linux; best-effort only.
+    try:
+        os.nice(-5)
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Could not raise timelapse thread priority: {e}")
+    try:
+        if hasattr(os, 'sched_setaffinity') and os.cpu_count() and os.cpu_count() > 1:
+            os.sched_setaffinity(0, {1})
+    except OSError as e:
+        logger.debug(f"Could not set timelapse thread affinity: {e}")
+
     # Use app context to ensure proper access to app attributes
     with app.app_context():
         cam = get_camera()
         
         if not cam:
             logger.error("Timelapse thread: Camera not available.")
-            app.timelapse_status = {
-                "active": False, 
-                "message": "Error: Camera not available", 
-                "count": 0, 
-                "total": count, 
-                "folder": None
-            }
+            _update_status(app, active=False, message="Error: Camera not available",
+                           count=0, total=count, folder=None)
             return
 
         # Create unique folder for this timelapse sequence
@@ -35,69 +66,68 @@ def run_timelapse(app, interval, count, format_override):
         sequence_path = os.path.join(TIMELAPSE_DIR, sequence_folder_name)
         
         try:
-            os.makedirs(sequence_path)
+            os.makedirs(sequence_path, exist_ok=True)
             logger.info(f"Created timelapse directory: {sequence_path}")
-            app.timelapse_status["folder"] = sequence_folder_name
+            _update_status(app, folder=sequence_folder_name)
         except OSError as e:
             logger.error(f"Failed to create timelapse directory {sequence_path}: {e}")
-            app.timelapse_status = {
-                "active": False, 
-                "message": f"Error: Cannot create directory {sequence_folder_name}", 
-                "count": 0, 
-                "total": count, 
-                "folder": None
-            }
+            _update_status(app, active=False,
+                           message=f"Error: Cannot create directory {sequence_folder_name}",
+                           count=0, total=count, folder=None)
             return
 
-        app.timelapse_status["active"] = True
-        app.timelapse_status["total"] = count
+        _update_status(app, active=True, total=count)
 
-        for i in range(count):
-            if app.timelapse_active.is_set():
-                logger.info("Timelapse cancelled by user.")
-                app.timelapse_status["message"] = f"Cancelled after {i} images."
-                app.timelapse_status["active"] = False
-                return
+        # Build every frame path up front (immutable tuple) so the capture
+        # loop allocates no strings between shots
+        photo_paths = tuple(f"{sequence_path}/{i:04d}.jpg" for i in range(1, count + 1))
 
-            app.timelapse_status["count"] = i + 1
-            app.timelapse_status["message"] = f"Capturing image {i+1} of {count}..."
-            logger.info(app.timelapse_status["message"])
+        # Schedule against a fixed monotonic start so capture duration never
+        # accumulates as drift and NTP wall-clock jumps cannot desync the run
+        start_time = time.monotonic()
 
-            cycle_start = time.time()  # Start timer immediately before capture
+        for i in range(count):
+            _update_status(app, count=i + 1, message=f"Capturing image {i+1} of {count}...")
+            logger.info(f"Capturing image {i+1} of {count}...")
 
             try:
-                # Build a full file path using save_path keyword
-                photo_file = os.path.join(sequence_path, f"{i+1:04d}.jpg")
-                success, filepath = cam.capture_image(save_path=photo_file)
+                success, filepath = cam.capture_image(save_path=photo_paths[i])
                 
                 if success:
                     logger.info(f"Image {i+1} captured successfully: {filepath}")
                 else:
                     logger.error(f"Failed to capture image {i+1}.")
-                    app.timelapse_status["message"] = f"Error capturing image {i+1}. Stopping."
-                    app.timelapse_status["active"] = False
+                    _update_status(app, active=False, message=f"Error capturing image {i+1}. Stopping.")
                     return
-                    
+
             except Exception as e:
                 logger.error(f"Exception during timelapse capture {i+1}: {e}", exc_info=True)
-                app.timelapse_status["message"] = f"Error capturing image {i+1}. Stopping."
-                app.timelapse_status["active"] = False
+                _update_status(app, active=False, message=f"Error capturing image {i+1}. Stopping.")
                 return
 
-            # Compute wait time relative to cycle start so timing is exact
-            wait_time = max(0, interval - (time.time() - cycle_start))
+            # Wait until the next absolute deadline so timing stays phase-locked.
+            # The deadline wait doubles as the (single) cancellation point per cycle.
+            next_deadline = start_time + (i + 1) * interval
             if i < count - 1:
-                app.timelapse_status["message"] = f"Image {i+1}/{count} captured. Waiting {wait_time:.1f}s..."
+                wait_time = max(0, next_deadline - time.monotonic())
+                _update_status(app, message=f"Image {i+1}/{count} captured. Waiting {wait_time:.1f}s...")
                 logger.info(f"Waiting {wait_time:.1f} seconds for next capture...")
-                if app.timelapse_active.wait(wait_time):
+                if _sleep_until(app.timelapse_active, next_deadline):
                     logger.info("Timelapse cancelled during wait.")
-                    app.timelapse_status["message"] = f"Cancelled after {i+1} images."
-                    app.timelapse_status["active"] = False
+                    _update_status(app, active=False, message=f"Cancelled after {i+1} images.")
                     return
 
+        # Captures overlap the writer thread's disk saves; make sure every
+        # frame is on disk before declaring the sequence complete.
+        if not cam.flush_pending_saves():
+            logger.error("One or more timelapse frames failed to save to disk.")
+            _update_status(app, active=False,
+                           message="Error: some frames failed to save. Check logs.")
+            return
+
         logger.info("Timelapse sequence completed.")
-        app.timelapse_status["message"] = f"Completed {count} images in folder {sequence_folder_name}."
-        app.timelapse_status["active"] = False
+        _update_status(app, active=False,
+                       message=f"Completed {count} images in folder {sequence_folder_name}.")
 
 @timelapse_bp.route('/start', methods=['POST'])
 def start_timelapse_api():
@@ -127,7 +157,10 @@ def start_timelapse_api():
         return jsonify({"success": False, "message": "Camera not available."}), 503
 
     app.timelapse_active.clear()  # Clear stop flag
-    app.timelapse_status = {"active": True, "message": "Starting...", "count": 0, "total": count, "folder": None}
+    with app.timelapse_status_cond:
+        app.timelapse_status = TimelapseStatus(active=True, message="Starting...",
+                                               count=0, total=count, folder=None)
+        app.timelapse_status_cond.notify_all()
     
     # Get a reference to the current app for the thread
     app_instance = current_app._get_current_object()
@@ -153,8 +186,7 @@ def stop_timelapse_api():
         # Don't join here, let it finish the current step and exit gracefully if possible
         app.logger.info("Stop signal sent to timelapse thread.")
         # Update status immediately for responsiveness, thread will update final status
-        app.timelapse_status["message"] = "Stopping..."
-        app.timelapse_status["active"] = False  # Mark as inactive from API perspective
+        _update_status(app, message="Stopping...", active=False)  # Inactive from API perspective
         return jsonify({"success": True, "message": "Stop signal sent to timelapse."})
     else:
         return jsonify({"success": False, "message": "No active timelapse to stop."})
@@ -163,14 +195,47 @@ def stop_timelapse_api():
 def get_timelapse_status_api():
     """API endpoint to get the status of the timelapse."""
     app = current_app
-    # Ensure status reflects thread life
-    if app.timelapse_status.get("active", False) and (app.timelapse_thread is None or not app.timelapse_thread.is_alive()):
-        # If status says active but thread is dead, update status
-        if not app.timelapse_active.is_set():  # Check if it wasn't manually stopped
-            app.timelapse_status["message"] = "Error: Timelapse thread terminated unexpectedly."
-        app.timelapse_status["active"] = False
+    with app.timelapse_status_lock:
+        # Ensure status reflects thread life
+        if app.timelapse_status.active and (app.timelapse_thread is None or not app.timelapse_thread.is_alive()):
+            # If status says active but thread is dead, update status
+            if not app.timelapse_active.is_set():  # Check if it wasn't manually stopped
+                app.timelapse_status.message = "Error: Timelapse thread terminated unexpectedly."
+            app.timelapse_status.active = False
 
-    return jsonify(app.timelapse_status)
+        snapshot = asdict(app.timelapse_status)
+
+    return jsonify(snapshot)
+
+@timelapse_bp.route('/events', methods=['GET'])
+def timelapse_events_api():
+    """API endpoint streaming timelapse status changes as Server-Sent Events."""
+    app = current_app._get_current_object()
+    app.logger.info("API request: /api/timelapse/events (SSE client connected)")
+
+    def generate():
+        last = None
+        while True:
+            with app.timelapse_status_cond:
+                snapshot = asdict(app.timelapse_status)
+                if snapshot == last:
+                    # Sleep until the worker notifies a change; the timeout
+                    # bounds how long a dead connection lingers undetected
+                    app.timelapse_status_cond.wait(timeout=15.0)
+                    snapshot = asdict(app.timelapse_status)
+            if snapshot != last:
+                last = snapshot
+                yield f"data: {json.dumps(snapshot)}\n\n"
+            else:
+                # Comment line keeps proxies/browsers from timing out the stream
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+# Cached folder listing for /list, invalidated via the directory's mtime
+# (the kernel bumps it on any mkdir/rename/unlink inside TIMELAPSE_DIR).
+_list_cache = {"mtime": 0, "folders": []}
+_list_cache_lock = threading.Lock()
 
 @timelapse_bp.route('/list', methods=['GET'])
 def list_timelapses_api():
@@ -182,10 +247,54 @@ def list_timelapses_api():
             app.logger.warning(f"Timelapse directory does not exist: {TIMELAPSE_DIR}")
             return jsonify({"timelapses": [], "message": "Timelapse directory not found."})
 
-        folders = [d for d in os.listdir(TIMELAPSE_DIR) if os.path.isdir(os.path.join(TIMELAPSE_DIR, d))]
-        # Sort folders, newest first
-        folders.sort(reverse=True)
+        st = os.stat(TIMELAPSE_DIR)
+        with _list_cache_lock:
+            if st.st_mtime_ns == _list_cache["mtime"]:
+                return jsonify({"timelapses": _list_cache["folders"]})
+
+            # scandir caches the entry type from the directory read itself, so
+            # is_dir() needs no extra stat() per folder (unlike listdir + isdir)
+            with os.scandir(TIMELAPSE_DIR) as it:
+                folders = [e.name for e in it if e.is_dir(follow_symlinks=False)]
+            # Sort folders, newest first
+            folders.sort(reverse=True)
+            _list_cache["mtime"] = st.st_mtime_ns
+            _list_cache["folders"] = folders
         return jsonify({"timelapses": folders})
     except Exception as e:
         app.logger.error(f"Error listing timelapse directories: {e}", exc_info=True)
-        return jsonify({"error": "Failed to list timelapse directories."}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to list timelapse directories."}), 500
+@timelapse_bp.route('/download/<folder>', methods=['GET'])
+def download_timelapse_api(folder):
+    """API endpoint to stream a whole timelapse folder as an on-the-fly ZIP."""
+    app = current_app
+    app.logger.info(f"API request: /api/timelapse/download/{folder}")
+
+    # Folder names are single path components created by run_timelapse
+    if '/' in folder or os.sep in folder or folder.startswith('.'):
+        return jsonify({"error": "Invalid folder name."}), 400
+
+    sequence_path = os.path.join(TIMELAPSE_DIR, folder)
+    if not os.path.isdir(sequence_path):
+        return jsonify({"error": "Timelapse folder not found."}), 404
+
+    try:
+        # sized=True forces STORE (no deflate) so the archive length is known
+        # up front; the frames are already-compressed JPEG/RAW, so deflate
+        # would only burn CPU for no size win.
+        zs = ZipStream(sized=True)
+        with os.scandir(sequence_path) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    zs.add_path(entry.path, entry.name)
+
+        headers = {
+            'Content-Disposition': f'attachment; filename="{folder}.zip"',
+            'Content-Length': str(len(zs)),
+        }
+        # The ZIP is assembled chunk by chunk as it streams: no temp file,
+        # first byte ships immediately.
+        return Response(zs, mimetype='application/zip', headers=headers)
+    except Exception as e:
+        app.logger.error(f"Error streaming timelapse ZIP for {folder}: {e}", exc_info=True)
+        return jsonify({"error": "Failed to build timelapse archive."}), 500
@@ -1,43 +1,318 @@
 import gphoto2 as gp
+import atexit
+import collections
+import concurrent.futures
 import os
 import logging
+import sys
 import threading
+from contextlib import suppress
 from PIL import Image # For resizing preview if needed
 import time # For adding delays if needed
 
 log = logging.getLogger(__name__)
 
-# Helper dictionary to map gphoto2 widget type constants to strings
-WIDGET_TYPE_MAP = {
-    gp.GP_WIDGET_WINDOW: 'WINDOW',
-    gp.GP_WIDGET_SECTION: 'SECTION',
-    gp.GP_WIDGET_TEXT: 'TEXT',
-    gp.GP_WIDGET_RANGE: 'RANGE',
-    gp.GP_WIDGET_TOGGLE: 'TOGGLE',
-    gp.GP_WIDGET_RADIO: 'RADIO',
-    gp.GP_WIDGET_MENU: 'MENU',
-    gp.GP_WIDGET_BUTTON: 'BUTTON',
-    gp.GP_WIDGET_DATE: 'DATE',
-    # gp.GP_WIDGET_CHOICE: 'CHOICE' # Removed this line
+# Optional libjpeg-turbo binding for preview downscaling. TurboJPEG can emit
+# a 1/2, 1/4 or 1/8 size image directly from the IDCT stage, skipping the
+# full-resolution RGB decode entirely; without it we fall back to PIL's
+# draft() mode, which uses the same DCT trick but through libjpeg.
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+# Pre-bound gphoto2 constants. The hot paths (config walk over 200+ widgets,
+# the per-frame preview error check) reference these constantly; a module
+# local is a single dict lookup where gp.X costs two. The error tuples also
+# replace per-call list literals.
+_GP_WIDGET_RANGE = gp.GP_WIDGET_RANGE
+_CONTAINER_WIDGET_TYPES = (gp.GP_WIDGET_SECTION, gp.GP_WIDGET_WINDOW)
+_CONNECTION_ERRORS = (gp.GP_ERROR_IO, gp.GP_ERROR_CAMERA_ERROR,
+                      gp.GP_ERROR_TIMEOUT, gp.GP_ERROR_CAMERA_BUSY)
+_INIT_RETRY_ERRORS = (gp.GP_ERROR_IO, gp.GP_ERROR_TIMEOUT)
+
+# Widget type names indexed by the GP_WIDGET_* enum value. The constants
+# are small contiguous ints, so a tuple index beats a dict lookup in the
+# per-widget walk. Built from the constants at import so the order can
+# never drift from the bindings.
+def _build_widget_type_names():
+    pairs = [
+        (gp.GP_WIDGET_WINDOW, 'WINDOW'),
+        (gp.GP_WIDGET_SECTION, 'SECTION'),
+        (gp.GP_WIDGET_TEXT, 'TEXT'),
+        (gp.GP_WIDGET_RANGE, 'RANGE'),
+        (gp.GP_WIDGET_TOGGLE, 'TOGGLE'),
+        (gp.GP_WIDGET_RADIO, 'RADIO'),
+        (gp.GP_WIDGET_MENU, 'MENU'),
+        (gp.GP_WIDGET_BUTTON, 'BUTTON'),
+        (gp.GP_WIDGET_DATE, 'DATE'),
+    ]
+    names = ['UNKNOWN'] * (max(code for code, _ in pairs) + 1)
+    for code, name in pairs:
+        names[code] = name
+    return tuple(names)
+
+_WIDGET_TYPE_NAMES = _build_widget_type_names()
+
+# Per-widget-type value converters for set_config. Each returns
+# (value_to_set, error_or_none); a dict dispatch replaces the per-call
+# if/elif chain and keeps the type-specific gphoto2 calls in one place.
+
+def _convert_range(widget, value):
+    """Converts and clamps `value` into the widget's numeric range."""
+    try:
+        min_val, max_val, step = widget.get_range()
+        return max(min_val, min(max_val, float(value))), None
+    except ValueError as e:
+        return None, f"Cannot convert '{value}' to a number: {e}"
+    except gp.GPhoto2Error as e_range:
+        log.warning(f"Could not get widget range during validation: {e_range.string}")
+        return str(value), None
+
+def _convert_toggle(widget, value):
+    """Converts `value` to the 0/1 form toggle widgets expect."""
+    try:
+        return (1 if int(value) != 0 else 0), None
+    except (ValueError, TypeError) as e:
+        return None, f"Cannot convert '{value}' to a toggle: {e}"
+
+def _convert_choice(widget, value):
+    """Converts `value` to str and validates it against the widget's choices."""
+    value_to_set = str(value)
+    try:
+        # Stop at the first match: each get_choice(i) is a binding call, and
+        # ISO/shutter lists run to 30+ entries. The full list is only built
+        # on the failure path, where the error message needs it.
+        n = widget.count_choices()
+        for i in range(n):
+            choice = widget.get_choice(i)
+            if choice is not None and str(choice) == value_to_set:
+                return value_to_set, None
+        str_choices = [str(c) for c in (widget.get_choice(i) for i in range(n))
+                       if c is not None]
+        return None, f"Invalid value '{value_to_set}'. Available: {str_choices}"
+    except gp.GPhoto2Error as e_choice:
+        log.warning(f"Could not get widget choices during validation: {e_choice.string}")
+    return value_to_set, None
+
+def _write_buffer(path, buf):
+    """
+    Writes a buffer-protocol object straight to `path` via a raw fd.
+    os.write copies directly from the underlying C buffer, so a memoryview
+    from camera_file.get_data_and_size() reaches the kernel with no
+    intermediate bytes object and no Python file-object layer.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write fewer bytes than asked (signals, quotas);
+        # zero-copy memoryview slices resume exactly where it stopped
+        mv = memoryview(buf)
+        while mv:
+            written = os.write(fd, mv)
+            mv = mv[written:]
+    finally:
+        os.close(fd)
+
+def _convert_default(widget, value):
+    """Fallback conversion for text and other widget types."""
+    return str(value), None
+
+_CONVERTERS = {
+    gp.GP_WIDGET_RANGE: _convert_range,
+    gp.GP_WIDGET_TOGGLE: _convert_toggle,
+    gp.GP_WIDGET_RADIO: _convert_choice,
+    gp.GP_WIDGET_MENU: _convert_choice,
 }
 
+
+class TrackedLock:
+    """
+    Drop-in wrapper around threading.Lock that records, per call site, how
+    long callers waited for the lock and how long they held it. The numbers
+    make lock contention visible (which caller starves behind a capture?)
+    at the cost of a couple of perf_counter_ns reads per acquire.
+    """
+
+    def __init__(self, lock=None):
+        self._l = lock if lock else threading.Lock()
+        # caller name -> [acquires, contended acquires, total wait ns, total hold ns]
+        self.stats = collections.defaultdict(lambda: [0, 0, 0, 0])
+        self._stats_lock = threading.Lock()
+        self._holder = None
+        self._acquired_at = 0
+
+    def acquire(self, blocking=True, timeout=-1, _caller=None):
+        caller = _caller if _caller else sys._getframe(1).f_code.co_name
+        t0 = time.perf_counter_ns()
+        # Try the uncontended fast path first; only count a wait if it fails
+        got = self._l.acquire(False)
+        contended = 0 if got else 1
+        if not got:
+            if not blocking:
+                return False
+            got = self._l.acquire(True, timeout)
+            if not got:
+                return False
+        wait_ns = time.perf_counter_ns() - t0
+        self._holder = caller
+        self._acquired_at = time.perf_counter_ns()
+        with self._stats_lock:
+            entry = self.stats[caller]
+            entry[0] += 1
+            entry[1] += contended
+            entry[2] += wait_ns
+        return True
+
+    def release(self):
+        holder = self._holder
+        hold_ns = time.perf_counter_ns() - self._acquired_at
+        self._holder = None
+        self._l.release()
+        if holder is not None:
+            with self._stats_lock:
+                self.stats[holder][3] += hold_ns
+
+    def __enter__(self):
+        self.acquire(_caller=sys._getframe(1).f_code.co_name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def locked(self):
+        return self._l.locked()
+
+    def dump_stats(self):
+        """Returns per-call-site contention stats as a JSON-friendly dict."""
+        with self._stats_lock:
+            return {
+                caller: {
+                    "acquires": entry[0],
+                    "contended": entry[1],
+                    "wait_ms": round(entry[2] / 1e6, 3),
+                    "hold_ms": round(entry[3] / 1e6, 3),
+                }
+                for caller, entry in self.stats.items()
+            }
+
+
 class CameraHandler:
     """Handles all interactions with the camera via gphoto2."""
 
-    def __init__(self, lock=None):
+    def __init__(self, lock=None, idle_timeout=120.0):
         """
         Initializes the camera handler state but does NOT connect immediately.
 
         Args:
             lock: A threading.Lock() object to ensure thread-safe camera access.
                   If None, a new lock is created.
+            idle_timeout: Seconds of inactivity after which the camera handle
+                  is released (keeps the sensor cool and saves power); the
+                  next request reconnects lazily. 0 disables auto-release.
         """
         self.camera = None
         self.context = None
-        # Use the provided lock or create a new one
-        self.lock = lock if lock else threading.Lock()
-        log.info("CameraHandler created. Connection will be initialized on first use.")
-        # DO NOT CALL initialize_camera() here anymore
+        # Use the provided lock or create a new one, instrumented so
+        # get_status(verbose=True) can report who waits on / holds it
+        self.lock = lock if isinstance(lock, TrackedLock) else TrackedLock(lock)
+        # Short-lived cache of the root config widget tree. A get_config is a
+        # full PTP round-trip over USB; UI interactions often issue several
+        # within a fraction of a second.
+        self._config_cache = None
+        self._config_cache_ts = 0.0
+        # Path-tuple -> widget index over the cached tree; turns per-element
+        # get_child_by_name sibling scans into one dict lookup
+        self._config_index = {}
+        # Serializes walks of the shared cached widget tree against
+        # set_config's in-place write. Separate from self.lock on purpose:
+        # walkers stay off the camera lock (so previews and status polls
+        # aren't queued behind dict building), but a walk concurrent with a
+        # widget.set_value would read SWIG-wrapped values mid-rewrite.
+        self._config_tree_lock = threading.Lock()
+        # Per-setting metadata snapshot (type/readonly/choices/range) built at
+        # connect time; lets set_config reject bad input without PTP traffic
+        self._config_meta = {}
+        # True while a capture owns the camera for a long USB transfer.
+        # Guarded by self.lock; lets other callers fail fast with "busy"
+        # instead of blocking behind the shutter for seconds.
+        self._busy = False
+        # True when the current busy reservation is a preview frame, which
+        # lasts only tens of ms: captures and config calls wait those out
+        # instead of failing, so live view never blocks the real work.
+        self._busy_preview = False
+        # Camera model, read once from the (local, no-PTP) abilities struct
+        self._model_name = "N/A"
+        # Short-lived status snapshot so UI polling doesn't take the lock
+        # (or trigger a reconnect attempt) several times per second
+        self._status_cache = None
+        self._status_cache_expiry = 0.0
+        # Set once the background warmup attempt has finished (success or not)
+        self._ready = threading.Event()
+        self._pending_saves = []
+        self._pending_saves_lock = threading.Lock()
+        # Single worker that streams shot N off the camera while the caller
+        # waits out the interval before shot N+1; depth-1 pipeline
+        self._download_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="CameraDownload")
+        self._last_download = None
+        # Producer thread for the live preview stream (started on demand);
+        # consumers just read the latest frame file and never touch the camera
+        self._preview_thread = None
+        self._preview_stop = threading.Event()
+        self._preview_state_lock = threading.Lock()
+        # Moving average of recent preview frame times, maintained by the
+        # producer loop; lets the stream pace itself to what the camera can
+        # actually deliver instead of the requested rate.
+        self._preview_frame_ewma = None
+        # CameraFile reused across stream frames (see capture_preview)
+        self._preview_file = None
+        # Extra bodies found by initialize_all_cameras, keyed by port
+        self._cameras = {}
+        # Idle auto-release: holding the handle keeps live view running on
+        # some bodies (sensor heat, power); release after a quiet period
+        self._idle_timeout = idle_timeout
+        self._last_activity = time.monotonic()
+        self._idle_stop = threading.Event()
+        # Explicit lifecycle: atexit runs close() while the interpreter is
+        # still healthy, instead of relying on __del__ at teardown time
+        atexit.register(self.close)
+        log.info("CameraHandler created. Connecting and warming up in the background.")
+        # Init + warmup happen off-thread so the first user-facing call does
+        # not pay the init / first-preview tax (~20 s on some Sony bodies)
+        threading.Thread(target=self._warmup, name="CameraWarmup", daemon=True).start()
+        if idle_timeout:
+            threading.Thread(target=self._idle_monitor, name="CameraIdleMonitor",
+                             daemon=True).start()
+
+    def _touch(self):
+        """Marks the handler as recently used, deferring idle auto-release."""
+        self._last_activity = time.monotonic()
+
+    def _idle_monitor(self):
+        """
+        Daemon loop: releases the camera after _idle_timeout seconds without
+        activity, unless a preview stream is running. The next request
+        reconnects lazily via _ensure_camera_connected.
+        """
+        while not self._idle_stop.wait(10.0):
+            if self.camera is None:
+                continue
+            if self._preview_thread is not None and self._preview_thread.is_alive():
+                continue
+            if time.monotonic() - self._last_activity < self._idle_timeout:
+                continue
+            # Non-blocking: if someone owns the camera it is not idle
+            if not self.lock.acquire(blocking=False):
+                continue
+            try:
+                if (not self._busy and self.camera is not None
+                        and time.monotonic() - self._last_activity >= self._idle_timeout):
+                    log.info(f"Camera idle for {self._idle_timeout:.0f}s; releasing handle.")
+                    self._release_camera()
+            finally:
+                self.lock.release()
 
 
     def initialize_camera(self):
@@ -64,21 +339,41 @@ class CameraHandler:
             self.camera = gp.Camera()
             log.info("Attempting camera.init()...")
             start_time = time.time()
-            self.camera.init(self.context)
+            # Retry transient I/O and timeout failures with a growing delay:
+            # some bodies (notably Nikon) need a short pause between USB
+            # enumeration and init, and a cold camera can drop the first PTP
+            # exchange. Retrying here turns a hard failure into a ~1-2 s wait.
+            last_ex = None
+            for attempt in range(3):
+                try:
+                    self.camera.init(self.context)
+                    break
+                except gp.GPhoto2Error as init_ex:
+                    if init_ex.code in _INIT_RETRY_ERRORS and attempt < 2:
+                        last_ex = init_ex
+                        delay = 0.75 * (attempt + 1)
+                        log.warning(f"camera.init() attempt {attempt + 1} failed "
+                                    f"({init_ex.code} - {init_ex.string}); retrying in {delay:.2f}s...")
+                        time.sleep(delay)
+                        continue
+                    raise
+            else:
+                raise last_ex
             end_time = time.time()
             log.info(f"camera.init() completed in {end_time - start_time:.2f}s.")
 
-            # Get model name after successful init
+            # Get model name after successful init. The abilities struct is
+            # filled in locally by libgphoto2 at init time, so unlike
+            # get_summary this costs no PTP traffic.
             try:
-                summary_text = self.camera.get_summary(self.context).text
-                model_name = "Unknown Model"
-                for line in summary_text.splitlines():
-                    if line.strip().startswith("Model:"):
-                        model_name = line.split(":", 1)[1].strip()
-                        break
-                log.info(f"Camera initialized successfully: {model_name}")
-            except Exception as summary_e:
-                 log.warning(f"Could not get/parse summary after init: {summary_e}")
+                abilities = self.camera.get_abilities()
+                # abilities.model comes from libgphoto2's local driver table,
+                # so no get_summary fetch or text parsing is ever needed
+                self._model_name = abilities.model or "Unknown Model"
+                log.info(f"Camera initialized successfully: {self._model_name}")
+            except Exception as abilities_e:
+                 self._model_name = "Unknown Model"
+                 log.warning(f"Could not read camera abilities after init: {abilities_e}")
                  log.info("Camera initialized successfully (model unknown).")
 
             return True
@@ -100,6 +395,119 @@ class CameraHandler:
              log.error(f"An unexpected error occurred during camera initialization: {e}", exc_info=True)
              raise ConnectionError(f"Unexpected error initializing camera: {e}") from e
 
+    @staticmethod
+    def _init_camera_at_port(name, port, port_info_list, abilities_list):
+        """Creates and inits one gp.Camera bound to a specific port."""
+        context = gp.Context()
+        camera = gp.Camera()
+        idx = port_info_list.lookup_path(port)
+        camera.set_port_info(port_info_list.get_info(idx))
+        ab_idx = abilities_list.lookup_model(name)
+        camera.set_abilities(abilities_list.get_abilities(ab_idx))
+        camera.init(context)
+        return camera, context
+
+    def initialize_all_cameras(self):
+        """
+        Detects every connected camera and initializes them in parallel, one
+        init() per port on its own thread. init() mostly waits on USB, so
+        concurrent inits cut multi-body cold start to roughly the slowest
+        single camera. Results land in self._cameras keyed by port, each
+        with its own lock (libgphoto2 requires serialized access per
+        camera). If no primary camera is connected yet, the first detected
+        body is adopted as the primary.
+        Returns the list of ports that initialized successfully.
+        """
+        try:
+            detected = gp.Camera.autodetect()
+        except gp.GPhoto2Error as ex:
+            log.error(f"Camera autodetect failed: {ex.code} - {ex.string}")
+            return []
+        if not detected:
+            log.info("No cameras detected.")
+            return []
+
+        port_info_list = gp.PortInfoList()
+        port_info_list.load()
+        abilities_list = gp.CameraAbilitiesList()
+        abilities_list.load()
+
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(detected),
+                thread_name_prefix="CameraInit") as pool:
+            futures = {
+                pool.submit(self._init_camera_at_port, name, port,
+                            port_info_list, abilities_list): (name, port)
+                for name, port in detected
+            }
+            for future in concurrent.futures.as_completed(futures):
+                name, port = futures[future]
+                try:
+                    camera, context = future.result()
+                except gp.GPhoto2Error as ex:
+                    log.error(f"Init failed for '{name}' on {port}: {ex.code} - {ex.string}")
+                    continue
+                except Exception as e:
+                    log.error(f"Unexpected init error for '{name}' on {port}: {e}", exc_info=True)
+                    continue
+                results[port] = {
+                    "camera": camera,
+                    "context": context,
+                    "lock": threading.Lock(),
+                    "model": name,
+                }
+                log.info(f"Initialized '{name}' on {port}.")
+
+        self._cameras = results
+        # Adopt the first body as the primary if nothing is connected yet,
+        # so the existing single-camera API works without a separate init
+        if results:
+            with self.lock:
+                if self.camera is None:
+                    first_port = next(iter(results))
+                    entry = results[first_port]
+                    self.camera = entry["camera"]
+                    self.context = entry["context"]
+                    self._model_name = entry["model"]
+                    log.info(f"Adopted '{entry['model']}' on {first_port} as primary camera.")
+        return list(results)
+
+    def _warmup(self):
+        """
+        Background thread: connects and primes the camera so the first
+        user-facing preview/capture is fast instead of paying the cold-start tax.
+        """
+        try:
+            with self.lock:
+                try:
+                    self.initialize_camera()
+                except ConnectionError as e:
+                    log.warning(f"Camera warmup: initialization failed ({e}). Will retry lazily on first use.")
+                    return
+                # Force libgphoto2 to populate its filesystem cache now
+                try:
+                    self.camera.folder_list_files('/', self.context)
+                except gp.GPhoto2Error as e:
+                    log.debug(f"Warmup folder listing failed (non-fatal): {e.string}")
+                # Snapshot per-setting metadata while we already own the
+                # camera, so later set_config calls validate locally
+                try:
+                    self._build_config_meta()
+                except Exception as e:
+                    log.debug(f"Warmup config metadata build failed (non-fatal): {e}")
+                # One throw-away preview spins up the live-view pipeline on
+                # bodies whose first preview call blocks for many seconds
+                try:
+                    self.camera.capture_preview()
+                    log.info("Warmup preview frame captured.")
+                except gp.GPhoto2Error as e:
+                    log.debug(f"Warmup preview failed (non-fatal): {e.string}")
+        except Exception as e:
+            log.error(f"Unexpected error during camera warmup: {e}", exc_info=True)
+        finally:
+            self._ready.set()
+
     def _release_camera(self):
         """Releases the camera connection safely."""
         # This method assumes the lock is already held by the caller
@@ -115,6 +523,10 @@ class CameraHandler:
             finally:
                  self.camera = None
                  self.context = None
+                 self._preview_file = None
+                 self._invalidate_config_cache()
+                 self._invalidate_status_cache()
+                 self._config_meta = {}
         else:
             log.debug("_release_camera called but camera object was already None.")
 
@@ -140,173 +552,419 @@ class CameraHandler:
              return False
 
 
-    def get_status(self):
-        """Gets basic camera status information."""
-        with self.lock:
+    def _reserve_camera(self, preview=False, wait_preview=2.0):
+        """
+        Reserves the camera for a long USB operation (capture/download).
+        Returns (camera, context) on success or None if busy/unavailable.
+        A reservation held by a preview frame is waited out (bounded by
+        wait_preview) rather than refused — frames release within tens of
+        ms and the live stream must never starve a capture or config call.
+        Real capture/download reservations still refuse immediately.
+        The caller MUST call _unreserve_camera() when the operation finishes.
+        """
+        self._touch()
+        deadline = time.monotonic() + wait_preview
+        while True:
+            with self.lock:
+                if not self._busy:
+                    if not self._ensure_camera_connected():
+                        return None
+                    self._busy = True
+                    self._busy_preview = preview
+                    self._invalidate_status_cache()
+                    return self.camera, self.context
+                if not self._busy_preview or time.monotonic() >= deadline:
+                    log.debug("Camera reservation refused: another capture is in progress.")
+                    return None
+            # A preview frame owns the camera; sleep unlocked so its
+            # _unreserve_camera can take the lock, then re-check
+            time.sleep(0.02)
+
+    def _try_reserve_camera(self, preview=False):
+        """
+        Non-blocking variant of _reserve_camera for drop-frame callers:
+        returns None immediately if the lock is contended instead of queueing
+        behind whoever holds it.
+        """
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            if self._busy:
+                return None
             if not self._ensure_camera_connected():
-                 return {"connected": False, "model": "N/A", "message": "Connection failed or camera not available."}
+                return None
+            self._touch()
+            self._busy = True
+            self._busy_preview = preview
+            self._invalidate_status_cache()
+            return self.camera, self.context
+        finally:
+            self.lock.release()
+
+    def _unreserve_camera(self):
+        """Clears the busy flag set by _reserve_camera."""
+        with self.lock:
+            self._busy = False
+            self._busy_preview = False
+            self._invalidate_status_cache()
 
-            try:
-                log.debug("Getting camera summary...")
-                summary = self.camera.get_summary(self.context)
-                log.debug("Camera summary retrieved.")
-                model_name = "N/A"
-                try:
-                    for line in summary.text.splitlines():
-                         if line.strip().startswith("Model:"):
-                            model_name = line.split(":", 1)[1].strip()
-                            break
-                except Exception:
-                    log.warning("Could not parse model name from summary text.")
-
-                return {
-                    "connected": True,
-                    "model": model_name,
-                    "message": "Ready"
-                }
-            except gp.GPhoto2Error as ex:
-                log.error(f"Error getting camera summary (after connection): {ex.code} - {ex.string}")
-                self._release_camera()
-                return {"connected": False, "model": "N/A", "message": f"Error communicating: {ex.string}"}
-            except Exception as e:
-                log.error(f"Unexpected error getting camera status: {e}", exc_info=True)
-                self._release_camera()
-                return {"connected": False, "model": "N/A", "message": f"Unexpected error: {e}"}
+    def _invalidate_status_cache(self):
+        """Drops the cached status snapshot (call when camera state changes)."""
+        self._status_cache = None
+        self._status_cache_expiry = 0.0
+
+    def get_status(self, verbose=False):
+        """Gets basic camera status information."""
+        if not self._ready.is_set():
+            # Don't queue status polls behind the warmup thread's init
+            return {"connected": False, "model": self._model_name,
+                    "message": "Camera initializing (warming up)..."}
+        # Serve a recent snapshot lock-free: UI polling issues several status
+        # reads per second, and each cold read risks a reconnect attempt.
+        if self._status_cache is not None and time.monotonic() < self._status_cache_expiry:
+            status = dict(self._status_cache)
+        else:
+            with self.lock:
+                if self._busy:
+                    status = {"connected": True, "model": self._model_name, "message": "Camera busy (capture in progress)."}
+                elif not self._ensure_camera_connected():
+                     status = {"connected": False, "model": "N/A", "message": "Connection failed or camera not available."}
+                else:
+                    # Model was cached at init from the abilities struct; no PTP
+                    # dialog needed for a status poll.
+                    status = {
+                        "connected": True,
+                        "model": self._model_name,
+                        "message": "Ready"
+                    }
+            self._status_cache = dict(status)
+            self._status_cache_expiry = time.monotonic() + 0.5
+        if verbose:
+            status["lock_stats"] = self.lock.dump_stats()
+        return status
 
 
     # --- Configuration Methods ---
 
+    def _get_cached_config(self, max_age=2.0):
+        """
+        Returns the root config widget, reusing a recently fetched tree.
+        The 2 s TTL bounds how stale camera-side dependent-setting changes
+        can look. MUST be called with the lock held and the camera connected.
+        """
+        if self._config_cache is not None and time.monotonic() - self._config_cache_ts < max_age:
+            log.debug("Using cached config tree.")
+            return self._config_cache
+        self._config_cache = self.camera.get_config(self.context)
+        self._config_cache_ts = time.monotonic()
+        try:
+            self._config_index = self._build_config_index(self._config_cache)
+        except Exception as e:
+            # Lookups fall back to tree traversal without the index
+            log.warning(f"Could not build config path index: {e}")
+            self._config_index = {}
+        return self._config_cache
+
+    def _invalidate_config_cache(self):
+        """Drops the cached config tree (call after writes or connection loss)."""
+        self._config_cache = None
+        self._config_cache_ts = 0.0
+        self._config_index = {}
+
+    @staticmethod
+    def _build_config_index(config_root):
+        """
+        Walks a freshly fetched tree once, mapping every widget's full path
+        tuple to the widget. Later lookups are a single dict hit instead of
+        a per-element sibling scan inside libgphoto2.
+        """
+        index = {}
+        stack = [(config_root, ())]
+        while stack:
+            widget, path = stack.pop()
+            for child in widget.get_children():
+                child_path = path + (child.get_name(),)
+                index[child_path] = child
+                if child.get_type() in _CONTAINER_WIDGET_TYPES:
+                    stack.append((child, child_path))
+        return index
+
+    def _fetch_config_root(self, purpose, max_age=2.0, wait_preview=2.0):
+        """
+        Shared entry for config readers: takes the lock, runs the busy and
+        connection checks, and returns the (possibly cached) config root —
+        or None on any failure, releasing the camera on connection-class
+        errors. A fresh cached tree is served no matter who owns the camera
+        (a cache hit needs no PTP traffic), and a preview-frame reservation
+        is waited out rather than refused — only a real capture blocks the
+        read. Callers walk the returned tree under _config_tree_lock (not
+        self.lock), since set_config mutates the cached tree in place.
+        """
+        self._touch()
+        deadline = time.monotonic() + wait_preview
+        while True:
+            with self.lock:
+                if (self._config_cache is not None
+                        and time.monotonic() - self._config_cache_ts < max_age):
+                    log.debug("Using cached config tree.")
+                    return self._config_cache
+                if not self._busy:
+                    if not self._ensure_camera_connected():
+                        log.error(f"Cannot {purpose}, camera not connected.")
+                        return None
+                    try:
+                        return self._get_cached_config(max_age=max_age)
+                    except gp.GPhoto2Error as ex:
+                        log.error(f"Error getting configuration root ({purpose}): {ex.code} - {ex.string}")
+                        if ex.code in (gp.GP_ERROR_IO, gp.GP_ERROR_CAMERA_ERROR):
+                             self._release_camera()
+                        return None
+                if not self._busy_preview or time.monotonic() >= deadline:
+                    log.info(f"Cannot {purpose}, camera busy with a capture.")
+                    return None
+            # Preview frame in flight: release the lock so it can finish,
+            # then retry
+            time.sleep(0.02)
+
     def list_all_config(self):
         """
         Lists all configuration settings available on the camera by walking the widget tree.
         Returns a dictionary representing the configuration structure.
         """
-        with self.lock:
-            if not self._ensure_camera_connected():
-                log.error("Cannot list config, camera not connected.")
-                return None
+        # Only the PTP fetch of the tree needs the camera serialized; walking
+        # the fetched widget tree is in-memory work and runs unlocked so
+        # status polls and previews aren't queued behind the dict building.
+        config_root = self._fetch_config_root("list config")
+        if config_root is None:
+            return None
 
-            try:
-                log.info("Fetching camera configuration tree root...")
-                config_root = self.camera.get_config(self.context)
-                log.info("Walking configuration tree...")
-                config_dict = {}
-                root_children = config_root.get_children()
-                for child in root_children:
-                    try:
-                        child_name = child.get_name()
-                        processed_child = self._walk_config_recursive(child)
-                        if processed_child:
-                             config_dict[child_name] = processed_child
-                    except gp.GPhoto2Error as child_ex:
-                         log.warning(f"Error processing top-level config child: {child_ex.string}. Skipping.")
-                    except Exception as child_e:
-                         log.error(f"Unexpected error processing top-level config child: {child_e}. Skipping.", exc_info=True)
-
-                log.info(f"Configuration tree walk completed. Found {len(config_dict)} top-level items.")
-                return config_dict if config_dict else {}
+        try:
+            log.info("Walking configuration tree...")
+            with self._config_tree_lock:
+                config_dict = self._walk_config(config_root)
+            log.info(f"Configuration tree walk completed. Found {len(config_dict)} top-level items.")
+            return config_dict
+        except Exception as e:
+             log.error(f"Unexpected error listing config: {e}", exc_info=True)
+             return None
 
-            except gp.GPhoto2Error as ex:
-                log.error(f"Error getting configuration root: {ex.code} - {ex.string}")
-                if ex.code in [gp.GP_ERROR_IO, gp.GP_ERROR_CAMERA_ERROR]:
-                     self._release_camera()
-                return None
-            except Exception as e:
-                 log.error(f"Unexpected error listing config: {e}", exc_info=True)
-                 return None
+    def list_config_tree(self, depth=2):
+        """
+        Shallow variant of list_all_config: walks only `depth` levels and
+        marks deeper sections with {"_lazy": True}. The UI fetches those on
+        expansion via get_config_subtree, so the initial settings-page load
+        reads a fraction of the widgets instead of the whole tree.
+        """
+        config_root = self._fetch_config_root("list config tree")
+        if config_root is None:
+            return None
 
-    def _get_widget_type_str(self, widget_type_enum):
-        """Helper function to safely get the string name for a widget type."""
-        return WIDGET_TYPE_MAP.get(widget_type_enum, 'UNKNOWN')
+        try:
+            with self._config_tree_lock:
+                return self._walk_config(config_root, max_depth=depth)
+        except Exception as e:
+             log.error(f"Unexpected error listing config tree: {e}", exc_info=True)
+             return None
+
+    def get_config_subtree(self, path):
+        """
+        Walks and returns only the subtree rooted at `path` (slash-joined or
+        a list of path elements). Complements list_config_tree's lazy
+        sections.
+        """
+        if isinstance(path, str):
+            path_elements = [p for p in path.split('/') if p]
+        else:
+            path_elements = list(path)
 
-    def _walk_config_recursive(self, widget):
-        """Recursively processes a single configuration widget and its children."""
-        if not widget:
+        config_root = self._fetch_config_root(f"get config subtree '{'/'.join(path_elements)}'")
+        if config_root is None:
             return None
 
-        widget_info = {}
         try:
-            widget_name = widget.get_name()
-            widget_label = widget.get_label()
-            widget_type_enum = widget.get_type()
-            widget_type_str = self._get_widget_type_str(widget_type_enum)
+            with self._config_tree_lock:
+                widget = self._find_widget_by_path(config_root, path_elements)
+                if widget is None:
+                    return None
+                return self._walk_config(widget)
+        except Exception as e:
+             log.error(f"Unexpected error reading config subtree: {e}", exc_info=True)
+             return None
 
-            # Fetch the current value of the widget
+    def _get_widget_type_str(self, widget_type_enum):
+        """Helper function to safely get the string name for a widget type."""
+        if 0 <= widget_type_enum < len(_WIDGET_TYPE_NAMES):
+            return _WIDGET_TYPE_NAMES[widget_type_enum]
+        return 'UNKNOWN'
+
+    def _read_widget_info(self, widget):
+        """
+        Reads one widget's attributes into a (name, info_dict, type_enum) tuple.
+        The single helper keeps all per-node gphoto2 accessor calls in one place.
+        """
+        # Low-level accessors: the walk visits every widget, and the
+        # gp_widget_* functions skip the per-call SWIG proxy wrappers
+        widget_name = gp.check_result(gp.gp_widget_get_name(widget))
+        widget_type_enum = gp.check_result(gp.gp_widget_get_type(widget))
+
+        # Containers (sections/windows) carry no value: skip the get_value
+        # round-trip and its try frame for the dozens of them in a tree
+        if widget_type_enum in _CONTAINER_WIDGET_TYPES:
+            return widget_name, {
+                "label": gp.check_result(gp.gp_widget_get_label(widget)),
+                "type": self._get_widget_type_str(widget_type_enum),
+                "readonly": gp.check_result(gp.gp_widget_get_readonly(widget)),
+                "value": "N/A",
+            }, widget_type_enum
+
+        # Fetch the current value of the widget
+        try:
+            widget_value = gp.check_result(gp.gp_widget_get_value(widget))
+            if widget_value is None:
+                log.warning(f"Widget '{widget_name}' has no value (None).")
+                widget_value = "N/A"
+        except gp.GPhoto2Error as e:
+            log.warning(f"Could not get value for widget '{widget_name}': {e.string}")
+            widget_value = "N/A"
+        except Exception as e_value:
+            log.error(f"Unexpected error getting value for widget '{widget_name}': {e_value}", exc_info=True)
+            widget_value = "N/A"
+
+        widget_info = {
+            "label": gp.check_result(gp.gp_widget_get_label(widget)),
+            "type": self._get_widget_type_str(widget_type_enum),
+            "readonly": gp.check_result(gp.gp_widget_get_readonly(widget)),
+            "value": widget_value,  # Include the fetched value
+        }
+
+        if widget_type_enum == _GP_WIDGET_RANGE:
             try:
-                widget_value = widget.get_value()
-                if widget_value is None:
-                    log.warning(f"Widget '{widget_name}' has no value (None).")
-                    widget_value = "N/A"
+                min_val, max_val, step = widget.get_range()
+                widget_info["min"] = min_val
+                widget_info["max"] = max_val
+                widget_info["step"] = step
             except gp.GPhoto2Error as e:
-                log.warning(f"Could not get value for widget '{widget_name}': {e.string}")
-                widget_value = "N/A"
-            except Exception as e_value:
-                log.error(f"Unexpected error getting value for widget '{widget_name}': {e_value}", exc_info=True)
-                widget_value = "N/A"
+                log.warning(f"Could not get range for widget '{widget_name}': {e.string}")
+            except Exception as e_range:
+                log.error(f"Unexpected error getting range for widget '{widget_name}': {e_range}", exc_info=True)
 
-            widget_info = {
-                "label": widget_label,
-                "type": widget_type_str,
-                "readonly": widget.get_readonly(),
-                "value": widget_value,  # Include the fetched value
-            }
+        return widget_name, widget_info, widget_type_enum
 
-            if widget_type_enum == gp.GP_WIDGET_RANGE:
-                try:
-                    min_val, max_val, step = widget.get_range()
-                    widget_info["min"] = min_val
-                    widget_info["max"] = max_val
-                    widget_info["step"] = step
-                except gp.GPhoto2Error as e:
-                    log.warning(f"Could not get range for widget '{widget_name}': {e.string}")
-                except Exception as e_range:
-                    log.error(f"Unexpected error getting range for widget '{widget_name}': {e_range}", exc_info=True)
+    def _walk_config(self, root_widget, max_depth=None):
+        """
+        Processes the configuration tree iteratively with an explicit stack.
+        Avoids Python recursion depth concerns and the per-level try/except
+        frames of the old recursive walk; a 200+ widget tree is flattened in
+        a single loop. Returns the nested config dict.
 
-            children_dict = {}
-            try:
-                children = widget.get_children()
-                if children:
-                    for child in children:
-                        try:
-                            child_name = child.get_name()
-                            processed_child = self._walk_config_recursive(child)
-                            if processed_child:
-                                children_dict[child_name] = processed_child
-                        except gp.GPhoto2Error as child_ex:
-                            log.warning(f"Error processing child '{child.get_name() if child else 'N/A'}' of '{widget_name}': {child_ex.string}. Skipping child.")
-                        except Exception as child_e:
-                            log.error(f"Unexpected error processing child '{child.get_name() if child else 'N/A'}' of '{widget_name}': {child_e}. Skipping child.", exc_info=True)
-
-                    if children_dict:
-                        widget_info["children"] = children_dict
+        With max_depth set, containers below that depth are returned as
+        scaffolding marked {"_lazy": True} instead of being descended into;
+        get_config_subtree fills them in on demand.
 
+        Precondition: every node is a gphoto2 widget, so the accessors
+        (get_name/get_type/...) always exist — no per-node hasattr guards.
+        """
+        if root_widget is None:
+            return None
+
+        top_level = {}
+        stack = [(root_widget, top_level, 0)]
+
+        while stack:
+            parent_widget, out_dict, depth = stack.pop()
+            try:
+                children = parent_widget.get_children()
             except gp.GPhoto2Error as e:
-                if widget_type_enum == gp.GP_WIDGET_SECTION or widget_type_enum == gp.GP_WIDGET_WINDOW:
-                    log.warning(f"Could not get children for section widget '{widget_name}': {e.string}")
+                log.warning(f"Could not get children for widget: {e.string}")
+                continue
             except Exception as e_children:
-                log.error(f"Unexpected error getting children for widget '{widget_name}': {e_children}", exc_info=True)
+                log.error(f"Unexpected error getting children for widget: {e_children}", exc_info=True)
+                continue
 
-            return widget_info
+            for child in children:
+                try:
+                    child_name, child_info, child_type = self._read_widget_info(child)
+                except gp.GPhoto2Error as child_ex:
+                    log.warning(f"Error processing widget attributes: {child_ex.string}. Skipping.")
+                    continue
+                except Exception as child_e:
+                    log.error(f"Unexpected error processing widget: {child_e}. Skipping.", exc_info=True)
+                    continue
+
+                out_dict[child_name] = child_info
+
+                # Only container widgets carry children worth descending into
+                if child_type in _CONTAINER_WIDGET_TYPES:
+                    if max_depth is not None and depth + 1 >= max_depth:
+                        child_info["_lazy"] = True
+                    else:
+                        child_info["children"] = {}
+                        stack.append((child, child_info["children"], depth + 1))
 
-        except gp.GPhoto2Error as e:
-            widget_name_for_log = 'Unknown Widget'
-            try:
-                widget_name_for_log = widget.get_name()
-            except:
-                pass
-            log.warning(f"Error processing widget attributes for '{widget_name_for_log}': {e.string}")
-            return None
-        except Exception as e_basic:
-            widget_name_for_log = 'Unknown Widget'
-            try:
-                widget_name_for_log = widget.get_name()
-            except:
-                pass
-            log.error(f"Unexpected error processing widget attributes for '{widget_name_for_log}': {e_basic}", exc_info=True)
+        return top_level
+
+    def _build_config_meta(self):
+        """
+        Snapshots per-setting metadata (type, readonly, choices, range) from
+        the config tree into self._config_meta, keyed by the full
+        slash-joined path. set_config consults it to reject read-only or
+        out-of-range writes without any PTP traffic.
+        MUST be called with the lock held and the camera connected.
+        """
+        meta = {}
+        stack = [(self._get_cached_config(), ())]
+        while stack:
+            widget, path = stack.pop()
+            for child in widget.get_children():
+                child_path = path + (child.get_name(),)
+                child_type = child.get_type()
+                if child_type in _CONTAINER_WIDGET_TYPES:
+                    stack.append((child, child_path))
+                    continue
+                entry = {"type": child_type, "readonly": bool(child.get_readonly())}
+                if child_type in (gp.GP_WIDGET_RADIO, gp.GP_WIDGET_MENU):
+                    entry["choices"] = frozenset(
+                        str(child.get_choice(i)) for i in range(child.count_choices()))
+                elif child_type == _GP_WIDGET_RANGE:
+                    entry["range"] = child.get_range()
+                meta['/'.join(child_path)] = entry
+        self._config_meta = meta
+        log.info(f"Config metadata built for {len(meta)} settings.")
+
+    def _get_config_meta_entry(self, setting_name):
+        """Looks up a setting's metadata snapshot entry, or None."""
+        meta = self._config_meta.get(setting_name)
+        if meta is None and '/' in setting_name:
+            meta = self._config_meta.get(setting_name.split('/', 1)[-1])
+        return meta
+
+    def _check_config_meta(self, setting_name, value):
+        """
+        Pre-validates a write against the connect-time metadata snapshot.
+        Returns an error message, or None if the write may proceed (including
+        when no metadata is available for the setting).
+        """
+        meta = self._get_config_meta_entry(setting_name)
+        if meta is None:
             return None
+        if meta["readonly"]:
+            return f"Setting '{setting_name}' is read-only."
+        choices = meta.get("choices")
+        if choices is not None and str(value) not in choices:
+            return f"Invalid value '{value}' for setting '{setting_name}'."
+        return None
 
     def _find_widget_by_path(self, config_root, path_elements):
-        """Manually find a widget by traversing the tree using path elements."""
+        """Finds a widget by path, via the prebuilt index when available."""
+        key = tuple(path_elements)
+        widget = self._config_index.get(key)
+        if widget is None and len(key) > 1:
+            # Callers sometimes include the root window name as the first
+            # element; the index is keyed relative to the root
+            widget = self._config_index.get(key[1:])
+        if widget is not None:
+            return widget
+
         widget = config_root
         try:
             for element in path_elements:
@@ -322,37 +980,72 @@ class CameraHandler:
 
     def get_config(self, setting_name):
         """Gets the value of a specific configuration setting using its full path."""
-        with self.lock:
-            if not self._ensure_camera_connected(): return None
+        # Hold the lock only for the PTP fetch; the path walk and value read
+        # on the fetched tree are in-memory operations. Repeated reads in the
+        # same window (a settings page pulling 10-20 values) share one fetch.
+        config = self._fetch_config_root(f"get config '{setting_name}'")
+        if config is None:
+            return None
 
-            try:
-                # *** CORRECTED: Manually find widget then get value ***
-                config = self.camera.get_config(self.context)
-                path_elements = setting_name.split('/')
-                widget = self._find_widget_by_path(config, path_elements)
+        try:
+            # get_child_by_name searches the in-memory tree recursively on
+            # the C side; only fall back to the Python path walk if the leaf
+            # name misses (e.g. duplicated names across sections)
+            with self._config_tree_lock:
+                widget = None
+                try:
+                    widget = config.get_child_by_name(setting_name.rsplit('/', 1)[-1])
+                except gp.GPhoto2Error:
+                    pass
+                if widget is None:
+                    widget = self._find_widget_by_path(config, setting_name.split('/'))
                 if widget:
                     value = widget.get_value()
-                    log.debug(f"Get config '{setting_name}': '{value}'")
+                    log.debug("Get config '%s': '%s'", setting_name, value)
                     return value
                 else:
                     # _find_widget_by_path already logged the error
                     return None
-            except gp.GPhoto2Error as ex:
-                log.error(f"Error getting config value for '{setting_name}': {ex.code} - {ex.string}")
-                return None
-            except Exception as e:
-                 log.error(f"Unexpected error getting config '{setting_name}': {e}", exc_info=True)
-                 return None
+        except gp.GPhoto2Error as ex:
+            log.error(f"Error getting config value for '{setting_name}': {ex.code} - {ex.string}")
+            return None
+        except Exception as e:
+             log.error(f"Unexpected error getting config '{setting_name}': {e}", exc_info=True)
+             return None
 
-    def set_config(self, setting_name, value):
-        """Sets the value of a specific configuration setting using its full path."""
-        with self.lock:
-            if not self._ensure_camera_connected():
-                return False, "Camera not connected."
+    def set_config(self, setting_name, value, verify=False):
+        """
+        Sets the value of a specific configuration setting using its full path.
+        Verification is opt-in (verify=True) because the camera already
+        rejects bad writes with an error; the default path costs no extra
+        round-trip.
+        """
+        self._touch()
+        # Reserve rather than just lock: adjusting exposure while watching
+        # live view is the core workflow, so an in-flight preview frame is
+        # waited out (and the stream kept off the camera for the duration
+        # of the write) instead of failing with "busy".
+        if self._reserve_camera() is None:
+            return False, "Camera busy (capture in progress) or not connected."
+        try:
+            return self._set_config_reserved(setting_name, value, verify)
+        finally:
+            self._unreserve_camera()
 
+    def _set_config_reserved(self, setting_name, value, verify):
+        """Performs the config write; the caller holds the busy reservation."""
+        with self.lock:
             try:
                 log.info(f"Attempting to set config '{setting_name}' to '{value}'")
-                config = self.camera.get_config(self.context)
+
+                # Fast local rejection from the connect-time metadata
+                # snapshot: bad writes cost zero camera round-trips
+                meta_error = self._check_config_meta(setting_name, value)
+                if meta_error is not None:
+                    log.warning(meta_error)
+                    return False, meta_error
+
+                config = self._get_cached_config()
                 # *** CORRECTED: Manually find the widget ***
                 path_elements = setting_name.split('/')
                 widget = self._find_widget_by_path(config, path_elements)
@@ -367,36 +1060,23 @@ class CameraHandler:
                      log.warning(msg)
                      return False, msg
 
-                # Perform type conversion and validation based on widget type
+                # Type conversion and validation via the per-type dispatch
+                # table (choice validation lives inside _convert_choice).
+                # If the metadata snapshot carries this widget's choice set,
+                # _check_config_meta above already proved membership — skip
+                # the per-choice binding calls (30-60 for a menu widget).
                 widget_type = widget.get_type()
-                value_to_set = value
-                try:
-                    if widget_type == gp.GP_WIDGET_RANGE:
-                        min_val, max_val, step = widget.get_range()
-                        value_to_set = max(min_val, min(max_val, float(value)))
-                    elif widget_type == gp.GP_WIDGET_TOGGLE:
-                        value_to_set = 1 if int(value) != 0 else 0
-                    else:
-                         value_to_set = str(value)
-                except ValueError as e:
-                     msg = f"Invalid value type for setting '{setting_name}'. Cannot convert '{value}'. Error: {e}"
-                     log.error(msg)
-                     return False, msg
-                except gp.GPhoto2Error as e_range:
-                     log.warning(f"Could not get range for setting '{setting_name}' during validation: {e_range.string}")
-                     value_to_set = str(value)
-
-                # Check choices if applicable
-                if widget_type in [gp.GP_WIDGET_RADIO, gp.GP_WIDGET_MENU]:
-                    try:
-                        choices = [widget.get_choice(i) for i in range(widget.count_choices())]
-                        str_choices = [str(c) for c in choices if c is not None]
-                        if str(value_to_set) not in str_choices:
-                            msg = f"Invalid value '{value_to_set}' for setting '{setting_name}'. Available: {str_choices}"
-                            log.error(msg)
-                            return False, msg
-                    except gp.GPhoto2Error as e_choice:
-                         log.warning(f"Could not get choices for setting '{setting_name}' during validation: {e_choice.string}")
+                meta_entry = self._get_config_meta_entry(setting_name)
+                if (widget_type in (gp.GP_WIDGET_RADIO, gp.GP_WIDGET_MENU)
+                        and meta_entry is not None and "choices" in meta_entry):
+                    value_to_set, convert_error = str(value), None
+                else:
+                    converter = _CONVERTERS.get(widget_type, _convert_default)
+                    value_to_set, convert_error = converter(widget, value)
+                if convert_error is not None:
+                    msg = f"Invalid value for setting '{setting_name}': {convert_error}"
+                    log.error(msg)
+                    return False, msg
 
                 # Get current value *after* potential type conversion for comparison
                 current_value = widget.get_value()
@@ -406,26 +1086,42 @@ class CameraHandler:
                      return True, msg
 
                 # *** CORRECTED: Set value on the found widget, then apply the whole config ***
-                log.debug(f"Setting widget '{setting_name}' from '{current_value}' to '{value_to_set}' (Type: {type(value_to_set)})")
-                widget.set_value(value_to_set)
+                log.debug("Setting widget '%s' from '%s' to '%s' (Type: %s)", setting_name, current_value, value_to_set, type(value_to_set))
+                # config is the shared cached tree that readers walk outside
+                # self.lock; the in-place write must not interleave with a walk
+                with self._config_tree_lock:
+                    widget.set_value(value_to_set)
                 self.camera.set_config(config, self.context)
+                # The write mutated the widget tree in place and the camera
+                # accepted it, so the tree still mirrors device state: keep
+                # it cached (fresh TTL) instead of forcing a re-fetch.
+                self._config_cache = config
+                self._config_cache_ts = time.monotonic()
+                self._invalidate_status_cache()
                 log.info(f"Successfully applied config change for '{setting_name}' to '{value_to_set}'")
 
-                # Optional verification
-                try:
-                    # Re-fetch config and widget to verify
-                    new_config = self.camera.get_config(self.context)
-                    check_widget = self._find_widget_by_path(new_config, path_elements)
-                    if check_widget:
-                        new_value = check_widget.get_value()
-                        log.info(f"Verified setting: {setting_name} = {new_value}")
-                        if str(new_value) != str(value_to_set):
-                            log.warning(f"Verification failed! Setting '{setting_name}' is '{new_value}' after set attempt.")
-                            return False, f"Verification failed. Value is still '{new_value}'."
-                    else:
-                         log.warning(f"Could not find widget '{setting_name}' for verification.")
-                except Exception as verify_e:
-                     log.warning(f"Could not verify setting '{setting_name}' after change: {verify_e}")
+                # Optional verification (opt-in only). libgphoto2 writes the
+                # applied value back into the widget we already hold, so check
+                # that first; the full PTP re-fetch happens only if the
+                # in-memory widget disagrees (some camlibs don't refresh it).
+                if verify:
+                    try:
+                        new_value = widget.get_value()
+                        if str(new_value) == str(value_to_set):
+                            log.info(f"Verified setting (in-memory): {setting_name} = {new_value}")
+                        else:
+                            new_config = self.camera.get_config(self.context)
+                            check_widget = self._find_widget_by_path(new_config, path_elements)
+                            if check_widget:
+                                new_value = check_widget.get_value()
+                                log.info(f"Verified setting (re-fetch): {setting_name} = {new_value}")
+                                if str(new_value) != str(value_to_set):
+                                    log.warning(f"Verification failed! Setting '{setting_name}' is '{new_value}' after set attempt.")
+                                    return False, f"Verification failed. Value is still '{new_value}'."
+                            else:
+                                 log.warning(f"Could not find widget '{setting_name}' for verification.")
+                    except Exception as verify_e:
+                         log.warning(f"Could not verify setting '{setting_name}' after change: {verify_e}")
 
                 return True, f"Setting '{setting_name}' updated to '{value_to_set}'."
 
@@ -444,126 +1140,381 @@ class CameraHandler:
                  return False, f"Unexpected error: {e}"
 
 
-    def capture_preview(self, target_path, rotation=0, flip=False):
+    def capture_preview(self, target_path, rotation=0, flip=False, scale=1,
+                        drop_on_contention=False):
         """
-        Captures a preview frame and saves it to target_path with optional rotation and flip.
+        Captures a preview frame and saves it to target_path with optional
+        rotation, flip, and integer downscale (scale=2/4/8 shrinks the frame
+        to 1/scale in each dimension during JPEG decode).
+        With drop_on_contention=True the frame is skipped instead of queueing
+        when another caller holds the camera — the stream just shows the next
+        frame a beat later. The camera is reserved only for the USB capture
+        itself; decoding and the file write run without the lock so they
+        never block other callers.
         """
-        with self.lock:
-            if not self._ensure_camera_connected(): return False
+        if drop_on_contention:
+            reservation = self._try_reserve_camera(preview=True)
+        else:
+            reservation = self._reserve_camera(preview=True)
+        if reservation is None:
+            return False
+        camera, context = reservation
 
+        try:
             try:
-                camera_file = self.camera.capture_preview()
-                file_data = camera_file.get_data_and_size()
+                # Low-level binding: skips the SWIG proxy allocation the OO
+                # camera.capture_preview() wrapper pays on every frame.
+                # Stream frames (drop_on_contention) reuse one CameraFile so
+                # libgphoto2 recycles its JPEG buffer instead of
+                # malloc/freeing it 20-30 times a second; that is safe
+                # because the stream has a single producer thread. One-shot
+                # calls get a fresh file, since their data may still be in
+                # use when the next frame lands.
+                if drop_on_contention:
+                    if self._preview_file is None:
+                        self._preview_file = gp.CameraFile()
+                    camera_file = self._preview_file
+                else:
+                    camera_file = gp.CameraFile()
+                gp.check_result(gp.gp_camera_capture_preview(
+                    camera, camera_file, context))
+            except gp.GPhoto2Error as ex:
+                log.warning(f"Could not capture preview: {ex.code} - {ex.string}")
+                if ex.code in _CONNECTION_ERRORS:
+                    log.warning("Potential connection issue during preview. Releasing camera handle.")
+                    with self.lock:
+                        self._release_camera()
+                with suppress(FileNotFoundError, OSError):
+                    os.unlink(target_path)
+                return False
+        finally:
+            self._unreserve_camera()
+
+        # Camera no longer needed from here: decode/rotate/write unlocked.
+        # Frames are written to a sibling temp file and renamed into place;
+        # rename is atomic on the same filesystem, so a reader fetching the
+        # preview mid-write always gets a complete frame, never a torn one.
+        tmp_path = target_path + '.tmp'
+        try:
+            if rotation or flip or scale > 1:
+                # Transform path: the pixels must come through Python anyway.
+                # memoryview avoids copying the frame into a second bytes object.
+                file_data = memoryview(camera_file.get_data_and_size())
 
-                if not file_data or len(file_data) == 0:
+                if len(file_data) == 0:
                     log.warning("Captured preview data is empty.")
-                    if os.path.exists(target_path):
-                        try: os.remove(target_path)
-                        except OSError: pass
+                    with suppress(FileNotFoundError, OSError):
+                        os.unlink(target_path)
                     return False
 
-                try:
-                    from PIL import Image
-                    import io
-                    image = Image.open(io.BytesIO(file_data))
-                    
-                    # Apply rotation first if needed
-                    if rotation:
-                        image = image.rotate(-rotation, expand=True)
-                    
-                    # Apply flip (only in Python, nowhere else)
-                    if flip:
-                        image = image.rotate(180)  # This is the ONLY place where flipping should occur
-                    
-                    image.save(target_path, "JPEG")
-                except Exception as e:
-                    log.error(f"Error processing preview image: {e}")
-                    with open(target_path, 'wb') as f:
-                        f.write(file_data)
+                if scale > 1 and not rotation and not flip and _turbo_jpeg is not None:
+                    # Pure downscale: libjpeg-turbo emits the reduced frame
+                    # straight from the IDCT, never touching full-res RGB
+                    try:
+                        img = _turbo_jpeg.decode(bytes(file_data), scaling_factor=(1, scale))
+                        _write_buffer(tmp_path, _turbo_jpeg.encode(img, quality=85))
+                    except Exception as e:
+                        log.error(f"TurboJPEG preview scaling failed: {e}")
+                        _write_buffer(tmp_path, file_data)
+                else:
+                    try:
+                        from PIL import Image
+                        import io
+                        image = Image.open(io.BytesIO(file_data))
+
+                        if scale > 1:
+                            # draft() applies the same DCT-scaling trick inside
+                            # libjpeg, so the decode itself is already reduced
+                            image.draft(image.mode, (image.width // scale, image.height // scale))
+
+                        # Apply rotation first if needed
+                        if rotation:
+                            image = image.rotate(-rotation, expand=True)
+
+                        # Apply flip (only in Python, nowhere else)
+                        if flip:
+                            image = image.rotate(180)  # This is the ONLY place where flipping should occur
+
+                        image.save(tmp_path, "JPEG")
+                    except Exception as e:
+                        log.error(f"Error processing preview image: {e}")
+                        _write_buffer(tmp_path, file_data)
+            else:
+                # Fast path: single C-side write by libgphoto2, no Python
+                # bytes round-trip (same API capture_image already uses)
+                # The save either wrote the whole frame or raised; no need to
+                # stat the file back just to confirm it is non-empty.
+                camera_file.save(tmp_path)
 
-                if os.path.getsize(target_path) == 0:
-                    log.warning(f"Preview file saved but is empty: {target_path}")
-                    return False
+            os.rename(tmp_path, target_path)
+            return True
+        except Exception as e:
+             log.error(f"Unexpected error capturing preview: {e}", exc_info=True)
+             with suppress(FileNotFoundError, OSError):
+                 os.unlink(tmp_path)
+             return False
 
-                return True
-            except gp.GPhoto2Error as ex:
-                log.warning(f"Could not capture preview: {ex.code} - {ex.string}")
-                if ex.code in [gp.GP_ERROR_IO, gp.GP_ERROR_CAMERA_ERROR, gp.GP_ERROR_TIMEOUT, gp.GP_ERROR_CAMERA_BUSY]:
-                    log.warning("Potential connection issue during preview. Releasing camera handle.")
-                    self._release_camera()
-                if os.path.exists(target_path):
-                    try: os.remove(target_path)
-                    except OSError: pass
-                return False
+    def _preview_loop(self, target_path, rate, rotation, flip, scale):
+        """
+        Producer loop for the preview stream. Captures frames at the target
+        rate into `target_path`; each frame is swapped in atomically by
+        capture_preview, so readers always see the most recent complete frame.
+        """
+        log.info(f"Preview stream started ({rate} FPS -> {target_path}).")
+        interval = 1.0 / rate
+        self._preview_frame_ewma = None
+        while not self._preview_stop.is_set():
+            frame_start = time.monotonic()
+            try:
+                if not self.capture_preview(target_path, rotation, flip, scale,
+                                            drop_on_contention=True):
+                    if self._busy or self.lock.locked():
+                        # Frame dropped because a capture owns the camera:
+                        # retry soon, the stream only ever wants the most
+                        # recent frame anyway
+                        self._preview_stop.wait(0.25)
+                    else:
+                        log.warning("Preview capture failed in stream loop.")
+                        self._preview_stop.wait(2.0)
+                    continue
             except Exception as e:
-                 log.error(f"Unexpected error capturing preview: {e}", exc_info=True)
-                 if os.path.exists(target_path):
-                     try: os.remove(target_path)
-                     except OSError: pass
-                 return False
+                log.error(f"Error in preview stream loop: {e}", exc_info=True)
+                self._preview_stop.wait(2.0)
+                continue
+            elapsed = time.monotonic() - frame_start
+            # Exponential moving average of the real per-frame cost. If the
+            # camera only delivers ~15 FPS, asking faster just blocks inside
+            # libgphoto2, so the pacing interval never drops below what the
+            # USB stream has been measured to sustain.
+            if self._preview_frame_ewma is None:
+                self._preview_frame_ewma = elapsed
+            else:
+                self._preview_frame_ewma = 0.8 * self._preview_frame_ewma + 0.2 * elapsed
+            effective_interval = max(interval, self._preview_frame_ewma)
+            self._preview_stop.wait(max(0, effective_interval - elapsed))
+        log.info("Preview stream stopped.")
 
-    def capture_image(self, save_path):
+    def start_preview_stream(self, target_path, rate=1.0, rotation=0, flip=False, scale=1):
         """
-        Captures a full-resolution image, downloads it, saves it to the specified file path,
-        attempts to delete it from the camera, then fully disconnects to ensure a fresh connection next time.
+        Starts the background preview producer thread.
+        Returns True if started, False if a stream is already running.
         """
-        with self.lock:
-            if not self._ensure_camera_connected():
-                return False, None
-
-            try:
-                log.info("Capturing image...")
-                file_path = self.camera.capture(gp.GP_CAPTURE_IMAGE, self.context)
-                log.info(f"Image captured on camera: Folder: '{file_path.folder}', Name: '{file_path.name}'")
+        with self._preview_state_lock:
+            if self._preview_thread and self._preview_thread.is_alive():
+                return False
+            self._preview_stop.clear()
+            self._preview_thread = threading.Thread(
+                target=self._preview_loop,
+                args=(target_path, rate, rotation, flip, scale),
+                name="PreviewProducer",
+                daemon=True
+            )
+            self._preview_thread.start()
+            return True
 
-                log.info(f"Downloading {file_path.name} from {file_path.folder}...")
-                camera_file = self.camera.file_get(file_path.folder, file_path.name, gp.GP_FILE_TYPE_NORMAL)
-                log.info("Image data downloaded from camera.")
+    def stop_preview_stream(self, timeout=5.0):
+        """
+        Signals the preview producer to stop and waits for it to finish.
+        Returns True if a running stream was stopped, False if none was active.
+        """
+        with self._preview_state_lock:
+            thread = self._preview_thread
+            self._preview_thread = None
+        if thread and thread.is_alive():
+            self._preview_stop.set()
+            thread.join(timeout)
+            if thread.is_alive():
+                log.warning("Preview stream thread did not stop within timeout.")
+            return True
+        return False
 
-                # --- Preserve original extension ---
-                orig_ext = os.path.splitext(file_path.name)[1]
-                base_save_path, _ = os.path.splitext(save_path)
-                save_path_with_ext = base_save_path + orig_ext
-                # -----------------------------------
+    def flush_pending_saves(self, timeout=None):
+        """
+        Waits for all queued background saves to hit disk.
+        Returns True if every pending save succeeded, False otherwise.
+        Call this before reading captured files back or reporting completion.
+        """
+        with self._pending_saves_lock:
+            pending = self._pending_saves
+            self._pending_saves = []
+        ok = True
+        for future in pending:
+            try:
+                if not future.result(timeout=timeout):
+                    ok = False
+            except Exception as e:
+                log.error(f"Pending save failed: {e}", exc_info=True)
+                ok = False
+        return ok
 
-                camera_file.save(save_path_with_ext)
-                log.info(f"Image successfully saved to {save_path_with_ext}")
+    def capture_image(self, save_path, release_after=False):
+        """
+        Captures a full-resolution image, downloads it, saves it to the specified
+        file path and attempts to delete it from the camera. The handle stays
+        warm afterwards so the next capture skips the ~1 s camera.init() cost;
+        pass release_after=True to force the old disconnect-per-shot behavior.
+        Returns as soon as the shutter has fired; the download and camera-side
+        delete continue on a background worker (flush_pending_saves() waits
+        for them). The camera stays reserved via the busy flag until the
+        download finishes, but the lock itself is never held across the
+        multi-second USB transfers, so other callers fail fast with "busy"
+        instead of blocking behind the shutter.
+        """
+        # Pipeline depth 1: wait for the previous shot's download before
+        # firing the next shutter. For a timelapse this wait lands at the
+        # start of the next frame slot, so the download of shot N effectively
+        # runs inside the idle interval after shot N.
+        previous = self._last_download
+        if previous is not None:
+            with suppress(Exception):
+                previous.result()
+
+        reservation = self._reserve_camera()
+        if reservation is None:
+            return False, None
+        camera, context = reservation
 
-                try:
-                    log.info(f"Attempting to delete '{file_path.name}' from camera folder '{file_path.folder}'...")
-                    self.camera.file_delete(file_path.folder, file_path.name)
-                    log.info(f"Successfully deleted '{file_path.name}' from camera.")
-                except gp.GPhoto2Error as del_ex:
-                    log.warning(f"Could not delete image from camera: {del_ex.code} - {del_ex.string}")
-                except Exception as del_e:
-                    log.warning(f"Unexpected error deleting image from camera: {del_e}", exc_info=True)
-
-                # Fully disconnect the camera after the capture
+        try:
+            log.info("Capturing image...")
+            file_path = camera.capture(gp.GP_CAPTURE_IMAGE, context)
+            log.info(f"Image captured on camera: Folder: '{file_path.folder}', Name: '{file_path.name}'")
+        except gp.GPhoto2Error as ex:
+            log.error(f"gphoto2 error during image capture: {ex.code} - {ex.string}")
+            if ex.code in _CONNECTION_ERRORS:
+                log.warning("Potential connection issue during capture. Releasing camera handle.")
+                with self.lock:
+                    self._release_camera()
+            self._unreserve_camera()
+            return False, None
+        except Exception as e:
+            log.error(f"Unexpected error capturing image: {e}", exc_info=True)
+            with self.lock:
                 self._release_camera()
+            self._unreserve_camera()
+            return False, None
+
+        # --- Preserve original extension ---
+        orig_ext = os.path.splitext(file_path.name)[1]
+        base_save_path, _ = os.path.splitext(save_path)
+        save_path_with_ext = base_save_path + orig_ext
+        # -----------------------------------
+
+        # The shutter has fired; the multi-second USB download runs on the
+        # download worker. The busy reservation stays held until the worker
+        # finishes, so no other caller touches the camera mid-transfer.
+        future = self._download_pool.submit(
+            self._download_and_finish, camera, context, file_path,
+            save_path_with_ext, release_after)
+        self._last_download = future
+        with self._pending_saves_lock:
+            self._pending_saves.append(future)
+
+        return True, save_path_with_ext
+
+    def _download_and_finish(self, camera, context, file_path, target_path, release_after):
+        """
+        Download-pool task: streams the captured file off the camera, deletes
+        the camera-side copy, then drops the busy reservation taken by
+        capture_image. Returns True if the file landed on disk.
+        """
+        try:
+            log.info(f"Downloading {file_path.name} from {file_path.folder}...")
+            # Stream USB packets straight into the output fd via a
+            # fd-backed CameraFile: the image never materializes as an
+            # in-memory blob (a 40 MB RAW used to double peak RSS), and the
+            # disk write inherently overlaps the USB transfer.
+            fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                camera_file = gp.CameraFile(fd)
+                gp.check_result(gp.gp_camera_file_get(
+                    camera, file_path.folder, file_path.name,
+                    gp.GP_FILE_TYPE_NORMAL, camera_file, context))
+            finally:
+                os.close(fd)
+            log.info(f"Image streamed to {target_path}")
 
-                return True, save_path_with_ext
+            try:
+                log.info(f"Attempting to delete '{file_path.name}' from camera folder '{file_path.folder}'...")
+                camera.file_delete(file_path.folder, file_path.name)
+                log.info(f"Successfully deleted '{file_path.name}' from camera.")
+            except gp.GPhoto2Error as del_ex:
+                log.warning(f"Could not delete image from camera: {del_ex.code} - {del_ex.string}")
+            except Exception as del_e:
+                log.warning(f"Unexpected error deleting image from camera: {del_e}", exc_info=True)
+
+            if release_after:
+                with self.lock:
+                    self._release_camera()
+            return True
+        except gp.GPhoto2Error as ex:
+            log.error(f"gphoto2 error during image download: {ex.code} - {ex.string}")
+            if ex.code in _CONNECTION_ERRORS:
+                with self.lock:
+                    self._release_camera()
+            with suppress(FileNotFoundError, OSError):
+                os.unlink(target_path)
+            return False
+        except Exception as e:
+            log.error(f"Unexpected error downloading image: {e}", exc_info=True)
+            with self.lock:
+                self._release_camera()
+            with suppress(FileNotFoundError, OSError):
+                os.unlink(target_path)
+            return False
+        finally:
+            self._unreserve_camera()
 
+    def heartbeat(self):
+        """
+        Cheap liveness probe for a warm handle: drains one camera event and
+        releases the handle if the USB link has gone away. Meant to be called
+        from an idle timer. Returns True if the camera still responds.
+        """
+        with self.lock:
+            if self.camera is None:
+                return False
+            if self._busy:
+                return True
+            try:
+                self.camera.wait_for_event(1, self.context)
+                return True
             except gp.GPhoto2Error as ex:
-                log.error(f"gphoto2 error during image capture/download: {ex.code} - {ex.string}")
-                if ex.code in [gp.GP_ERROR_IO, gp.GP_ERROR_CAMERA_ERROR, gp.GP_ERROR_TIMEOUT, gp.GP_ERROR_CAMERA_BUSY]:
-                    log.warning("Potential connection issue during capture. Releasing camera handle.")
-                    self._release_camera()
-                return False, None
-            except Exception as e:
-                log.error(f"Unexpected error capturing image: {e}", exc_info=True)
+                log.warning(f"Heartbeat failed: {ex.code} - {ex.string}. Releasing camera.")
                 self._release_camera()
-                return False, None
+                return False
 
-    def __del__(self):
-        """Ensure camera is released when the object is destroyed."""
-        # This function remains the same
-        print("CameraHandler being destroyed. Releasing camera...")
-        if self.lock.acquire(blocking=False):
+    def close(self, timeout=5.0):
+        """
+        Stops background workers and releases the camera. Safe to call more
+        than once; registered with atexit so the USB device is handed back
+        even if callers never close explicitly.
+        """
+        self._idle_stop.set()
+        self.stop_preview_stream()
+        with suppress(Exception):
+            self.flush_pending_saves(timeout=timeout)
+        # Bounded wait: if another thread wedged the lock, log and move on
+        # rather than deadlocking shutdown (the old __del__ did the same
+        # with a non-blocking try, silently leaking the camera).
+        if self.lock.acquire(timeout=timeout):
             try:
-                if self.camera:
-                    print(f"Releasing camera object {id(self.camera)} in __del__")
-                    self._release_camera()
+                self._release_camera()
             finally:
                 self.lock.release()
         else:
-             print("Could not acquire lock in __del__ to release camera. Might be held by another thread.")
+            log.warning(f"Could not acquire camera lock within {timeout:.1f}s during close; camera handle may leak.")
+        # Hand back any extra bodies from initialize_all_cameras; the
+        # primary (if adopted from this dict) was already exited above
+        for port, entry in list(self._cameras.items()):
+            if entry["camera"] is not None and entry["camera"] is not self.camera:
+                with suppress(Exception):
+                    entry["camera"].exit(entry["context"])
+        self._cameras = {}
+        self._download_pool.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
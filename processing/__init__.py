@@ -0,0 +1,16 @@
+# This file makes Python treat the directory as a package.
+# Image processing lives here, separate from camera control and the web app.
+#
+# The editors transitively import PIL, NumPy and rawpy (~50+ MB RSS), which
+# a Flask server that never touches processing shouldn't pay for at startup.
+# They are resolved lazily on first attribute access instead.
+
+
+def __getattr__(name):
+    if name == 'ImageEditor':
+        from .image_editor import ImageEditor
+        return ImageEditor
+    if name == 'TimelapseEditor':
+        from .timelapse_editor import TimelapseEditor
+        return TimelapseEditor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
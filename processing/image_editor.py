@@ -0,0 +1,453 @@
+import logging
+import os
+
+import numpy as np
+import rawpy
+import PIL
+from PIL import Image, ImageEnhance, ImageFilter
+
+log = logging.getLogger(__name__)
+
+# pillow-simd is a drop-in Pillow replacement (same API, AVX2 kernels for
+# resize/convert/enhance) and identifies itself with a '.postN' version
+# suffix; point users at it once when plain Pillow is doing the pixel work
+if 'post' not in getattr(PIL, '__version__', ''):
+    log.info("Plain Pillow detected; installing pillow-simd "
+             "('pip install pillow-simd') makes batch edits and previews "
+             "several times faster on x86.")
+
+# OpenCV resize is several times faster than Pillow's scalar convolution
+# for the large downscales previews need; optional, PIL path works without it
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# libjpeg-turbo's SIMD encoder roughly doubles JPEG save throughput over
+# Pillow's bundled libjpeg; optional, same pattern as the preview path in
+# the camera module
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+
+def _save_jpeg(image, output_path, quality=95):
+    """Saves a PIL image as JPEG via TurboJPEG when available, else Pillow."""
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    if _turbo_jpeg is not None:
+        buf = _turbo_jpeg.encode(np.asarray(image), quality=quality,
+                                 pixel_format=TJPF_RGB)
+        with open(output_path, 'wb') as f:
+            f.write(buf)
+    else:
+        image.save(output_path, 'JPEG', quality=quality)
+
+# A full proxy-state checkpoint is kept every this many edits; undo
+# rewinds to the nearest checkpoint and replays at most this many ops on
+# the proxy. Bounds memory at history/interval snapshots while keeping
+# undo depth unlimited.
+CHECKPOINT_INTERVAL = 8
+
+# Longest edge of the interactive proxy. Edits run on the proxy and are
+# replayed once on the full image at save time, so interactive cost scales
+# with proxy pixels (~1 MP) instead of sensor pixels (24+ MP).
+PROXY_MAX_SIZE = 1024
+
+# Camera RAW extensions (lowercase, with dot); frozenset so per-file checks
+# in batch loops are a hash lookup with no allocation
+_RAW_EXTS = frozenset({'.arw', '.cr2', '.crw', '.dng', '.nef', '.orf',
+                       '.pef', '.raf', '.raw', '.rw2', '.srw'})
+
+
+def _resize(image, size):
+    """
+    Resizes a PIL image via cv2 when available (INTER_AREA for downscale,
+    Lanczos otherwise), falling back to PIL's LANCZOS.
+    """
+    if cv2 is not None:
+        downscale = size[0] < image.width or size[1] < image.height
+        interp = cv2.INTER_AREA if downscale else cv2.INTER_LANCZOS4
+        return Image.fromarray(cv2.resize(np.asarray(image), size, interpolation=interp))
+    return image.resize(size, Image.LANCZOS)
+
+
+# PIL transpose opcodes for exact right-angle rotations (counter-clockwise)
+_TRANSPOSE_BY_ANGLE = {90: Image.ROTATE_90, 180: Image.ROTATE_180, 270: Image.ROTATE_270}
+
+
+def _rotate(image, angle):
+    """
+    Rotates counter-clockwise. Right-angle rotations use transpose — a
+    pure strided copy — instead of BICUBIC resampling, which on a 24 MP
+    image is tens of ms versus seconds of interpolation for an identical
+    result. Arbitrary angles fall through to the resampled rotate.
+    """
+    a = angle % 360
+    if a == 0:
+        return image
+    opcode = _TRANSPOSE_BY_ANGLE.get(a)
+    if opcode is not None:
+        return image.transpose(opcode)
+    return image.rotate(angle, resample=Image.BICUBIC, expand=True)
+
+
+def _apply_bcs(image, b, c, sat):
+    """
+    Applies brightness/contrast/saturation factors in one fused pass.
+    Brightness and contrast are a per-channel affine map, so they collapse
+    into a 256-entry uint8 LUT — one byte gather per pixel instead of a
+    float multiply/add/clamp, and no float32 intermediate (4x the bytes)
+    unless saturation actually needs one.
+    """
+    if b == 1.0 and c == 1.0 and sat == 1.0:
+        return image
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    lut = None
+    if b != 1.0 or c != 1.0:
+        # Contrast pivots around mid-gray, then brightness scales
+        lut = np.clip(((np.arange(256, dtype=np.float32) - 127.5) * c + 127.5) * b,
+                      0, 255).astype(np.uint8)
+        if sat == 1.0:
+            # Pure LUT path: Pillow applies the table in C per channel
+            return image.point(lut.tolist() * 3)
+    # Saturation as a luminance blend: gray + s * (rgb - gray), computed
+    # over row tiles so the float32 working set stays cache-sized instead
+    # of streaming a full-frame 4x-sized temporary through DRAM per step
+    src = np.asarray(image)
+    height, width = src.shape[:2]
+    out = np.empty_like(src)
+    rows = max(1, (4 << 20) // (width * 12))
+    weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    for y0 in range(0, height, rows):
+        tile = src[y0:y0 + rows]
+        if lut is not None:
+            tile = lut[tile]
+        ftile = tile.astype(np.float32)
+        gray = (ftile @ weights)[:, :, None]
+        np.subtract(ftile, gray, out=ftile)
+        ftile *= sat
+        ftile += gray
+        np.clip(ftile, 0, 255, out=ftile)
+        out[y0:y0 + rows] = ftile
+    return Image.fromarray(out)
+
+
+class ImageEditor:
+    """
+    Loads a single image (JPEG/PNG/TIFF or RAW via rawpy) and applies
+    edits to it.
+
+    Interactive edits run against a downscaled proxy; edit_history records
+    every operation in full-resolution coordinates and save() replays the
+    whole list once against the original image. A slider drag therefore
+    costs proxy-sized passes (50-100x cheaper on a 24 MP source) and the
+    full-resolution price is paid exactly once.
+
+    Undo keeps proxy-state checkpoints every CHECKPOINT_INTERVAL edits
+    and replays at most that many proxy-sized ops to rewind — unlimited
+    undo depth at bounded memory, and the replay work is capped and runs
+    on ~1 MP images.
+    """
+
+    def __init__(self, input_path):
+        self.input_path = input_path
+        self.image = None            # working proxy image
+        self.original_image = None   # full-resolution source
+        self.edit_history = []
+        # [(op_index, state)] — state as captured before the op at op_index
+        self._checkpoints = []
+        # Staged tonal adjustments (brightness/contrast/saturation factors).
+        # They accumulate here and are applied as one fused NumPy pass on
+        # the next flush instead of one full-image pass per slider change.
+        self._pending = {'b': 1.0, 'c': 1.0, 's': 1.0}
+        # Downscaled previews keyed by (image identity, max_size); cleared
+        # on every edit so a slider drag doesn't redo the full-res resize
+        # for each repeated get_preview call
+        self._preview_cache = {}
+        # Size the full-resolution image would have after the recorded
+        # geometric ops; crop boxes and resize targets are interpreted in
+        # this coordinate space
+        self._virtual_size = None
+        # Full-resolution output size; for RAW the full decode is deferred
+        # until save, so this is known before original_image exists
+        self._full_size = None
+        # Image the proxy is built from (half-size decode for RAW)
+        self._proxy_source = None
+        self.load_image()
+
+    def _check_if_raw(self):
+        """Returns True if the input file looks like a camera RAW file."""
+        return os.path.splitext(self.input_path)[1].lower() in _RAW_EXTS
+
+    def load_image(self):
+        """Loads the input file and builds the interactive proxy."""
+        try:
+            if self._check_if_raw():
+                log.info(f"Loading RAW file: {self.input_path}")
+                # half_size skips demosaic interpolation entirely (2x2 block
+                # average) — ~4x less work and memory than a full decode, and
+                # plenty for the 1024 px proxy. The full postprocess runs
+                # lazily in _full_image() only when a save needs it.
+                with rawpy.imread(self.input_path) as raw:
+                    rgb = raw.postprocess(use_camera_wb=True, half_size=True,
+                                          output_bps=8)
+                half = Image.fromarray(rgb)
+                self.original_image = None
+                self._proxy_source = half
+                self._full_size = (half.width * 2, half.height * 2)
+            else:
+                log.info(f"Loading image file: {self.input_path}")
+                img = Image.open(self.input_path)
+                # Header parse already gives the full size; for JPEGs,
+                # draft() then makes libjpeg decode at 1/2, 1/4 or 1/8 DCT
+                # scale — only the proxy-sized pixels are ever decoded.
+                # The full decode happens lazily in _full_image() at save.
+                self._full_size = img.size
+                if img.format == 'JPEG':
+                    img.draft('RGB', (PROXY_MAX_SIZE, PROXY_MAX_SIZE))
+                    img.load()
+                    self.original_image = None
+                    self._proxy_source = img
+                else:
+                    img.load()
+                    # No defensive copy: every mutator assigns a new image,
+                    # so the loaded image is never modified in place
+                    self.original_image = img
+                    self._proxy_source = img
+            self._virtual_size = self._full_size
+            self.image = self._make_proxy(self._proxy_source)
+            self._checkpoints = [(0, self._state())]
+        except Exception as e:
+            log.error(f"Failed to load image '{self.input_path}': {e}", exc_info=True)
+            raise
+
+    def _full_image(self):
+        """Returns the full-resolution source, decoded lazily on first use."""
+        if self.original_image is None:
+            if self._check_if_raw():
+                log.info(f"Running full-resolution RAW postprocess: {self.input_path}")
+                with rawpy.imread(self.input_path) as raw:
+                    rgb = raw.postprocess(use_camera_wb=True, output_bps=8)
+                self.original_image = Image.fromarray(rgb)
+            else:
+                log.info(f"Running full-resolution decode: {self.input_path}")
+                full = Image.open(self.input_path)
+                full.load()
+                self.original_image = full
+            self._full_size = self.original_image.size
+        return self.original_image
+
+    @staticmethod
+    def _make_proxy(full):
+        """Builds the downscaled working copy (or reuses small images as-is)."""
+        scale = min(PROXY_MAX_SIZE / full.width, PROXY_MAX_SIZE / full.height, 1.0)
+        if scale >= 1.0:
+            # Safe to share the reference: edits always produce new images
+            return full
+        return _resize(full, (int(full.width * scale), int(full.height * scale)))
+
+    def _proxy_scale(self):
+        """Current proxy-pixels-per-virtual-pixel factor."""
+        return self.image.width / self._virtual_size[0]
+
+    def _state(self):
+        """Captures the proxy working state for a checkpoint."""
+        return (self.image, dict(self._pending), self._virtual_size)
+
+    def _restore_state(self, state):
+        self.image, pending, self._virtual_size = state
+        self._pending = dict(pending)
+
+    def _push_undo(self, op, params):
+        """Records the edit, checkpointing the pre-op state periodically."""
+        # A slider drag arrives as a run of identical tonal ops; their
+        # factors compose multiplicatively, so fold the run into one entry.
+        # Keeps the history (and any later replay of it) O(gestures) instead
+        # of O(slider events), and one undo reverts the whole drag.
+        if (op in ('brightness', 'contrast', 'saturation') and self.edit_history
+                and self.edit_history[-1][0] == op):
+            self.edit_history[-1] = (op, self.edit_history[-1][1] * params)
+            self._preview_cache.clear()
+            return
+        index = len(self.edit_history)
+        if index - self._checkpoints[-1][0] >= CHECKPOINT_INTERVAL:
+            self._checkpoints.append((index, self._state()))
+        self.edit_history.append((op, params))
+        self._preview_cache.clear()
+
+    def _apply_op_proxy(self, op, params):
+        """Applies one recorded op to the proxy (shared by mutators and undo replay)."""
+        if op == 'brightness':
+            self._pending['b'] *= params
+            return
+        if op == 'contrast':
+            self._pending['c'] *= params
+            return
+        if op == 'saturation':
+            self._pending['s'] *= params
+            return
+        self._flush_adjustments()
+        if op == 'crop':
+            factor = self._proxy_scale()
+            proxy_box = tuple(int(round(v * factor)) for v in params)
+            self.image = self.image.crop(proxy_box)
+            self._virtual_size = (params[2] - params[0], params[3] - params[1])
+        elif op == 'rotate':
+            factor = self._proxy_scale()
+            self.image = _rotate(self.image, params)
+            self._virtual_size = (int(round(self.image.width / factor)),
+                                  int(round(self.image.height / factor)))
+        elif op == 'resize':
+            scale = min(PROXY_MAX_SIZE / params[0], PROXY_MAX_SIZE / params[1], 1.0)
+            self.image = _resize(self.image, (int(params[0] * scale), int(params[1] * scale)))
+            self._virtual_size = params
+        elif op == 'filter':
+            self.image = self.image.filter(getattr(ImageFilter, params.upper()))
+
+    def _flush_adjustments(self):
+        """Applies the staged tonal factors to the proxy in one fused pass."""
+        b, c, sat = self._pending['b'], self._pending['c'], self._pending['s']
+        if b == 1.0 and c == 1.0 and sat == 1.0:
+            return
+        self.image = _apply_bcs(self.image, b, c, sat)
+        self._pending = {'b': 1.0, 'c': 1.0, 's': 1.0}
+
+    def crop(self, box):
+        """Crops to `box` (left, upper, right, lower) in full-res coordinates."""
+        self._push_undo('crop', box)
+        self._apply_op_proxy('crop', box)
+        return True
+
+    def adjust_brightness(self, factor):
+        """Adjusts brightness; factor 1.0 leaves the image unchanged."""
+        self._push_undo('brightness', factor)
+        self._apply_op_proxy('brightness', factor)
+        return True
+
+    def adjust_contrast(self, factor):
+        """Adjusts contrast; factor 1.0 leaves the image unchanged."""
+        self._push_undo('contrast', factor)
+        self._apply_op_proxy('contrast', factor)
+        return True
+
+    def adjust_saturation(self, factor):
+        """Adjusts color saturation; factor 1.0 leaves the image unchanged."""
+        self._push_undo('saturation', factor)
+        self._apply_op_proxy('saturation', factor)
+        return True
+
+    def rotate(self, angle):
+        """Rotates the image counter-clockwise by `angle` degrees."""
+        self._push_undo('rotate', angle)
+        self._apply_op_proxy('rotate', angle)
+        return True
+
+    def resize(self, size):
+        """Resizes the image to `size` (width, height) in full-res terms."""
+        self._push_undo('resize', size)
+        self._apply_op_proxy('resize', size)
+        return True
+
+    def apply_filter(self, filter_name):
+        """Applies a named ImageFilter (e.g. 'BLUR', 'SHARPEN')."""
+        pil_filter = getattr(ImageFilter, filter_name.upper(), None)
+        if pil_filter is None:
+            log.warning(f"Unknown filter: {filter_name}")
+            return False
+        self._push_undo('filter', filter_name)
+        self._apply_op_proxy('filter', filter_name)
+        return True
+
+    def undo(self):
+        """Reverts the most recent edit. Returns False if nothing to undo."""
+        if not self.edit_history:
+            log.info("Undo requested but history is empty.")
+            return False
+        self.edit_history.pop()
+        target = len(self.edit_history)
+        # Rewind to the nearest checkpoint at or before the target, then
+        # replay the (at most CHECKPOINT_INTERVAL) remaining ops on the proxy
+        while self._checkpoints[-1][0] > target:
+            self._checkpoints.pop()
+        index, state = self._checkpoints[-1]
+        self._restore_state(state)
+        for op, params in self.edit_history[index:target]:
+            self._apply_op_proxy(op, params)
+        self._preview_cache.clear()
+        return True
+
+    def reset(self):
+        """Discards all edits and restores the originally loaded image."""
+        self._virtual_size = self._full_size
+        self.image = self._make_proxy(self._proxy_source)
+        self.edit_history = []
+        self._pending = {'b': 1.0, 'c': 1.0, 's': 1.0}
+        self._checkpoints = [(0, self._state())]
+        self._preview_cache.clear()
+        return True
+
+    def get_preview(self, max_size=1024):
+        """Returns the current proxy downscaled to fit max_size (cached)."""
+        self._flush_adjustments()
+        cache_key = (id(self.image), max_size)
+        cached = self._preview_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        width, height = self.image.size
+        scale = min(max_size / width, max_size / height, 1.0)
+        if scale >= 1.0:
+            preview = self.image
+        else:
+            preview = _resize(self.image, (int(width * scale), int(height * scale)))
+        self._preview_cache[cache_key] = preview
+        return preview
+
+    def _render_full(self):
+        """Replays the recorded edit list once against the full-res source."""
+        image = self._full_image()
+        # Include tonal factors still staged on the proxy
+        ops = list(self.edit_history)
+        for op, key in (('brightness', 'b'), ('contrast', 'c'), ('saturation', 's')):
+            if self._pending[key] != 1.0:
+                ops.append((op, self._pending[key]))
+        b, c, sat = 1.0, 1.0, 1.0
+        for op, params in ops:
+            # Consecutive tonal ops fold into one fused pass; geometric ops
+            # flush first so ordering matches the interactive sequence
+            if op == 'brightness':
+                b *= params
+            elif op == 'contrast':
+                c *= params
+            elif op == 'saturation':
+                sat *= params
+            else:
+                image = _apply_bcs(image, b, c, sat)
+                b, c, sat = 1.0, 1.0, 1.0
+                if op == 'crop':
+                    image = image.crop(params)
+                elif op == 'rotate':
+                    image = _rotate(image, params)
+                elif op == 'resize':
+                    image = _resize(image, params)
+                elif op == 'filter':
+                    image = image.filter(getattr(ImageFilter, params.upper()))
+        return _apply_bcs(image, b, c, sat)
+
+    def save(self, output_path, format=None, quality=95):
+        """Renders the edits at full resolution and saves to output_path."""
+        try:
+            image = self._render_full()
+            save_format = format or os.path.splitext(output_path)[1].lstrip('.').upper()
+            if save_format in ('JPG', 'JPEG'):
+                _save_jpeg(image, output_path, quality)
+            else:
+                image.save(output_path, save_format or None)
+            log.info(f"Saved edited image to {output_path}")
+            return True
+        except Exception as e:
+            log.error(f"Failed to save image to '{output_path}': {e}", exc_info=True)
+            return False
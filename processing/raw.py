@@ -0,0 +1,606 @@
+import collections
+import concurrent.futures
+import functools
+import itertools
+import logging
+import os
+import re
+import subprocess
+import threading
+
+import numpy as np
+import rawpy
+from PIL import Image
+
+from .image_editor import _RAW_EXTS, _apply_bcs, _save_jpeg
+
+# tifffile writes NumPy arrays directly (no PIL buffer copy) and keeps
+# 16-bit depth, which PIL would squash to 8; optional like turbojpeg
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+log = logging.getLogger(__name__)
+
+FFMPEG_PATH = 'ffmpeg'
+
+_NAT_SPLIT = re.compile(r'(\d+)')
+
+
+def _natkey(name):
+    """Natural sort key so frame_2 orders before frame_10."""
+    return [int(part) if part.isdigit() else part
+            for part in _NAT_SPLIT.split(name)]
+
+# Hardware H.264 encoders in preference order; fixed-function encode is
+# typically 5-20x faster than libx264 at comparable quality. h264_vaapi is
+# deliberately absent: it only accepts frames already uploaded to a VAAPI
+# surface, which the rawvideo-on-stdin pipeline never produces.
+_HW_ENCODERS = ('h264_nvenc', 'h264_qsv', 'h264_videotoolbox')
+
+# Per-encoder spelling of the constant-quality flag; everything not listed
+# takes -crf
+_QUALITY_FLAGS = {'h264_nvenc': '-cq', 'h264_qsv': '-global_quality'}
+
+
+def _probe_ffmpeg(flag, line_filter):
+    """Runs ffmpeg with a single listing flag and collects matching names."""
+    try:
+        result = subprocess.run([FFMPEG_PATH, '-hide_banner', flag],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError) as e:
+        log.warning(f"Could not probe ffmpeg {flag}: {e}")
+        return frozenset()
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and line_filter(parts[0]):
+            names.add(parts[1])
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_caps():
+    """
+    Probes the local ffmpeg binary once per process for its compiled-in
+    encoders and pixel formats, so bad codec settings can be rejected
+    before any decoding work starts instead of minutes into a batch.
+    """
+    return {
+        # Encoder lines look like " V....D h264_nvenc   NVIDIA NVENC ..."
+        'encoders': _probe_ffmpeg('-encoders',
+                                  lambda flags: flags[0] in 'VAS'),
+        # Pixel format lines look like "IO... yuv420p  3  12"
+        'pix_fmts': _probe_ffmpeg('-pix_fmts',
+                                  lambda flags: flags[0] in 'IO.'),
+    }
+
+
+def _available_encoders():
+    return _ffmpeg_caps()['encoders']
+
+
+def _validate_codec_settings(codec_settings):
+    """Returns an error message if the requested codec cannot run here, else None."""
+    codec = (codec_settings or {}).get('codec')
+    if not codec:
+        return None
+    encoders = _ffmpeg_caps()['encoders']
+    # An empty probe means ffmpeg itself could not be queried; leave that
+    # to the assembly step's own missing-binary error
+    if encoders and codec not in encoders:
+        return f"Encoder '{codec}' is not available in the local ffmpeg"
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder_works(name):
+    """
+    Confirms an encoder can actually produce output on this machine with a
+    one-frame test encode. The -encoders listing only reflects what ffmpeg
+    was compiled with — stock distro builds list h264_nvenc/h264_qsv with
+    or without the matching GPU present.
+    """
+    try:
+        result = subprocess.run(
+            [FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+             '-f', 'rawvideo', '-pixel_format', 'rgb24',
+             '-video_size', '128x128', '-framerate', '30', '-i', '-',
+             '-frames:v', '1', '-c:v', name, '-pix_fmt', 'yuv420p',
+             '-f', 'null', '-'],
+            input=b'\x00' * (128 * 128 * 3),
+            capture_output=True, timeout=15)
+    except (OSError, subprocess.SubprocessError) as e:
+        log.warning(f"Could not test encoder '{name}': {e}")
+        return False
+    return result.returncode == 0
+
+
+def _pick_h264_encoder():
+    """Returns (encoder, quality_flag) — a working hw encoder, else libx264."""
+    available = _available_encoders()
+    for name in _HW_ENCODERS:
+        if name in available and _encoder_works(name):
+            return name, _QUALITY_FLAGS.get(name, '-crf')
+    return 'libx264', '-crf'
+
+
+# 16-bit linear -> 8-bit sRGB gamma table, built once and shared by every
+# frame in a batch (the per-call cost of exposure+gamma becomes one fancy
+# index per pixel instead of float pow math)
+_GAMMA_LUT = None
+_GAMMA_LUT16 = None
+
+
+def _gamma_lut():
+    global _GAMMA_LUT
+    if _GAMMA_LUT is None:
+        _GAMMA_LUT = ((np.arange(65536) / 65535.0) ** (1 / 2.2) * 255).astype(np.uint8)
+    return _GAMMA_LUT
+
+
+def _gamma_lut16():
+    """Same tone curve as _gamma_lut but staying in 16 bits for TIFF output."""
+    global _GAMMA_LUT16
+    if _GAMMA_LUT16 is None:
+        _GAMMA_LUT16 = ((np.arange(65536) / 65535.0) ** (1 / 2.2) * 65535).astype(np.uint16)
+    return _GAMMA_LUT16
+
+
+# One LibRaw processor per thread (and so per pool worker process), reused
+# across frames: close() recycles LibRaw's working buffers but keeps the
+# instance alive, so a batch pays library setup once instead of per frame
+_RAW_LOCAL = threading.local()
+
+
+def _raw_decoder():
+    raw = getattr(_RAW_LOCAL, 'decoder', None)
+    if raw is None:
+        raw = rawpy.RawPy()
+        _RAW_LOCAL.decoder = raw
+    return raw
+
+
+def _process_raw_file(raw_path, white_balance='camera', temperature=0.0,
+                      tint=0.0, fast_demosaic=False, linear_16bit=True):
+    """
+    Decodes a RAW file to RGB. With linear_16bit (the default) the result
+    is a uint16 linear array — exposure and tone are applied afterwards in
+    NumPy. With linear_16bit=False, LibRaw applies its own tone curve and
+    emits uint8 directly, halving the output buffer and skipping the LUT
+    pass; use it when no exposure adjustment will follow.
+
+    fast_demosaic swaps LibRaw's default AHD demosaic for PPG, which is
+    several times faster at slightly lower edge quality — the right trade
+    for timelapse frames that end up downscaled into a video anyway.
+    """
+    raw = _raw_decoder()
+    try:
+        raw.open_file(raw_path)
+        raw.unpack()
+        postprocess_args = {'no_auto_bright': True}
+        if linear_16bit:
+            postprocess_args['gamma'] = (1, 1)
+            postprocess_args['output_bps'] = 16
+        else:
+            postprocess_args['output_bps'] = 8
+        if fast_demosaic:
+            postprocess_args['demosaic_algorithm'] = rawpy.DemosaicAlgorithm.PPG
+        if white_balance == 'camera':
+            postprocess_args['use_camera_wb'] = True
+        elif white_balance == 'auto':
+            postprocess_args['use_auto_wb'] = True
+        else:
+            # Manual WB from temperature/tint sliders (-100..100); each
+            # multiplier is just the factor clamped to [0.5, 2.0]
+            temp_factor = 1.0 + temperature / 200.0
+            r_mult = max(0.5, min(2.0, temp_factor))
+            b_mult = max(0.5, min(2.0, 1.0 / temp_factor))
+            g_mult = max(0.5, min(2.0, 1.0 + tint / 200.0))
+            postprocess_args['user_wb'] = [r_mult / g_mult, 1.0, b_mult / g_mult, 1.0]
+        rgb_image = raw.postprocess(**postprocess_args)
+    finally:
+        raw.close()
+    return rgb_image
+
+
+def process_raw(input_path, output_path, brightness=1.0, contrast=1.0,
+                saturation=1.0, white_balance='camera', temperature=0.0,
+                tint=0.0, output_format='JPEG', quality=95,
+                fast_demosaic=False):
+    """
+    Processes a single RAW file to JPEG/TIFF with the given settings.
+    Returns True on success.
+    """
+    try:
+        wants_16bit_tiff = (output_format.upper() in ('TIF', 'TIFF')
+                            and tifffile is not None
+                            and contrast == 1.0 and saturation == 1.0)
+        # The 16-bit linear intermediate only earns its keep when exposure
+        # is applied in linear space or the output stays 16-bit; otherwise
+        # let LibRaw emit tone-mapped uint8 directly — half the buffer and
+        # no LUT pass (the common camera-defaults timelapse case)
+        needs_linear = brightness != 1.0 or wants_16bit_tiff
+        rgb_image = _process_raw_file(input_path, white_balance, temperature,
+                                      tint, fast_demosaic, needs_linear)
+        if needs_linear:
+            # Exposure is a linear-space multiply on the 16-bit demosaic
+            # output, and the sRGB tone curve is one shared LUT gather
+            if brightness != 1.0:
+                rgb_image = np.clip(rgb_image.astype(np.int32) * brightness,
+                                    0, 65535).astype(np.uint16)
+            if wants_16bit_tiff:
+                # Hand the array straight to tifffile: no 8-bit downconvert,
+                # no PIL round-trip, and the full 16-bit depth survives
+                tifffile.imwrite(output_path, _gamma_lut16()[rgb_image],
+                                 compression='deflate', photometric='rgb')
+                return True
+            rgb_image = _gamma_lut()[rgb_image]
+        image = Image.fromarray(rgb_image)
+        # Contrast and saturation fuse into one LUT + blend pass; brightness
+        # was already applied in linear space above
+        image = _apply_bcs(image, 1.0, contrast, saturation)
+        if output_format.upper() in ('JPG', 'JPEG'):
+            _save_jpeg(image, output_path, quality)
+        else:
+            image.save(output_path, output_format.upper())
+        return True
+    except Exception as e:
+        log.error(f"Failed to process RAW '{input_path}': {e}", exc_info=True)
+        return False
+
+
+def _process_raw_job(args):
+    """Top-level (picklable) worker wrapper: one (input, output, settings) job."""
+    input_path, output_path, settings = args
+    return process_raw(input_path, output_path, **settings)
+
+
+def process_image_batch(image_paths, output_dir, settings=None,
+                        output_format='JPEG', max_workers=None):
+    """
+    Processes a list of RAW files into output_dir with shared settings,
+    fanned out over a process pool. Each process_raw call is independent
+    CPU-bound work (LibRaw demosaic + tonal adjustments), so the pool
+    scales near-linearly with cores and sidesteps the GIL.
+    Returns a dict with 'successful', 'failed' and per-file results.
+    """
+    settings = dict(settings or {})
+    settings.setdefault('output_format', output_format)
+    output_ext = '.jpg' if output_format.upper() in ('JPG', 'JPEG') else '.tif'
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    for input_path in image_paths:
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        jobs.append((input_path, os.path.join(output_dir, base + output_ext), settings))
+
+    results = {'successful': 0, 'failed': 0, 'progress': 0, 'files': []}
+    if not jobs:
+        return results
+
+    # One worker per core; LibRaw's own OpenMP threading is disabled in the
+    # workers so N processes don't each spin up N threads and thrash
+    os.environ.setdefault('OMP_NUM_THREADS', '1')
+    max_workers = max_workers or os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for i, ok in enumerate(pool.map(_process_raw_job, jobs, chunksize=1)):
+            if ok:
+                results['successful'] += 1
+                results['files'].append(jobs[i][1])
+            else:
+                results['failed'] += 1
+            results['progress'] = int(100 * (i + 1) / len(jobs))
+            log.info(f"Batch processing progress: {results['progress']}%")
+    return results
+
+
+def handle_timelapse_processing(image_paths, output_dir, settings=None,
+                                output_format='JPEG', max_workers=None):
+    """
+    Processes a timelapse's RAW frames in parallel. Same as
+    process_image_batch but defaults to the fast demosaic, since the
+    frames end up downscaled into a video.
+    """
+    settings = dict(settings or {})
+    settings.setdefault('fast_demosaic', True)
+    return process_image_batch(image_paths, output_dir, settings,
+                               output_format, max_workers)
+
+
+def assemble_timelapse(image_folder, output_path, fps=30, codec_settings=None,
+                       image_ext=None, progress_callback=None):
+    """
+    Assembles the processed frames in image_folder into a video by piping
+    raw RGB straight into ffmpeg's stdin. Compared to the pattern-glob
+    input this skips ffmpeg's own image decode pass (frames are decoded
+    once, in Python) and never depends on ffmpeg re-scanning the
+    directory. Callers that know the frame format (e.g. the staging
+    pipeline) can pass image_ext to match exactly one extension.
+    Returns True on success.
+    """
+    error = _validate_codec_settings(codec_settings)
+    if error:
+        log.error(error)
+        return False
+
+    if image_ext:
+        exts = ('.' + image_ext.lower().lstrip('.'),)
+    else:
+        exts = ('.jpg', '.jpeg', '.png', '.tif', '.tiff')
+    # scandir streams DirEntry objects without the extra per-name stat that
+    # listdir-based filtering tends to grow into
+    with os.scandir(image_folder) as entries:
+        images = sorted((e.name for e in entries
+                         if e.name.lower().endswith(exts)), key=_natkey)
+    if not images:
+        log.error(f"No frames found in {image_folder}")
+        return False
+
+    # The first frame fixes the stream geometry; stragglers are resized
+    with Image.open(os.path.join(image_folder, images[0])) as first:
+        width, height = first.size
+
+    cmd = _build_ffmpeg_cmd(width, height, fps, codec_settings, output_path)
+
+    def _frames():
+        for name in images:
+            with Image.open(os.path.join(image_folder, name)) as img:
+                frame = img.convert('RGB')
+                if frame.size != (width, height):
+                    frame = frame.resize((width, height))
+                yield np.asarray(frame, dtype=np.uint8).tobytes()
+
+    codec_settings = codec_settings or {}
+    if (codec_settings.get('codec') == 'libvpx-vp9'
+            and codec_settings.get('two_pass')):
+        # VP9 gains 20-30% compression from two-pass; only offered here,
+        # where the frames sit on disk and the stream can be regenerated
+        # for the second pass
+        passlog = output_path + '.ffpass'
+        analyze = cmd[:-1] + ['-pass', '1', '-passlogfile', passlog,
+                              '-an', '-f', 'null', os.devnull]
+        encode = cmd[:-1] + ['-pass', '2', '-passlogfile', passlog, cmd[-1]]
+        try:
+            return (_stream_to_ffmpeg(analyze, _frames(), output_path)
+                    and _stream_to_ffmpeg(encode, _frames(), output_path,
+                                          progress_callback))
+        finally:
+            try:
+                os.remove(passlog + '-0.log')
+            except OSError:
+                pass
+
+    return _stream_to_ffmpeg(cmd, _frames(), output_path, progress_callback)
+
+
+def _build_ffmpeg_cmd(width, height, fps, codec_settings, output_path):
+    """Builds the rawvideo-on-stdin ffmpeg command for the given geometry."""
+    codec_settings = codec_settings or {}
+    crf = str(codec_settings.get('crf', 23))
+    # Timelapse frames change a lot shot-to-shot, so x264's slower presets
+    # burn CPU on motion search that finds little; veryfast encodes ~3x
+    # faster here for a marginal bitrate cost
+    preset = codec_settings.get('preset', 'veryfast')
+    codec = codec_settings.get('codec')
+    if codec is None:
+        if codec_settings.get('hw_accel', True):
+            # No explicit codec requested: prefer a hardware encoder when
+            # the local ffmpeg has one, falling back to libx264
+            codec, _ = _pick_h264_encoder()
+        else:
+            codec = 'libx264'
+        log.info(f"Using video encoder: {codec}")
+    # The constant-quality flag is per-encoder (NVENC rejects -crf), so
+    # translate it for explicitly requested codecs too
+    quality_flag = _QUALITY_FLAGS.get(codec, '-crf')
+    cmd = [
+        FFMPEG_PATH, '-y',
+        '-f', 'rawvideo',
+        '-pixel_format', 'rgb24',
+        '-video_size', f'{width}x{height}',
+        '-framerate', str(fps),
+        '-i', '-',
+        '-c:v', codec,
+        '-pix_fmt', 'yuv420p',
+        output_path,
+    ]
+    # Preset names differ per encoder family: x264/x265 take the named
+    # speed presets, NVENC takes p1-p7 (p5 ~ balanced); the other hw
+    # encoders have no preset knob worth setting
+    ncpu = os.cpu_count() or 1
+    if codec in ('libx264', 'libx265'):
+        cmd[-1:-1] = ['-preset', preset, '-threads', '0']
+        if codec == 'libx264':
+            # Sliced threading parallelizes within each frame, which scales
+            # better than x264's default frame threading for large stills
+            cmd[-1:-1] = ['-tune', codec_settings.get('tune', 'stillimage'),
+                          '-x264-params', f'threads={ncpu}:sliced-threads=1']
+    elif codec == 'h264_nvenc':
+        cmd[-1:-1] = ['-preset', codec_settings.get('nvenc_preset', 'p5')]
+    elif codec == 'libvpx-vp9':
+        # VP9 is single-threaded without row-mt + tiling. -b:v 0 switches
+        # libvpx from constrained quality (capped at the 256 kbps default
+        # bitrate) to true constant-quality CRF.
+        cmd[-1:-1] = ['-row-mt', '1', '-tile-columns', '4',
+                      '-threads', str(ncpu), '-b:v', '0']
+    cmd[-1:-1] = [quality_flag, crf]
+    return cmd
+
+
+def _stream_to_ffmpeg(cmd, frames, output_path, progress_callback=None):
+    """
+    Spawns ffmpeg and writes each byte buffer yielded by frames to its
+    stdin. Stderr is drained on a side thread: per-frame progress goes to
+    debug logging (and to progress_callback as an encoded-frame count,
+    when given), the last few real lines are kept for the error message,
+    and the pipe can never fill and stall the encoder while this thread is
+    busy writing frames. Returns True on success.
+    """
+    try:
+        log.info(f"Assembling timelapse: {' '.join(cmd)}")
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        log.error("ffmpeg not found. Is it installed and on PATH?")
+        return False
+
+    stderr_tail = []
+
+    def _drain_stderr():
+        for raw_line in proc.stderr:
+            line = raw_line.decode('utf-8', errors='replace').strip()
+            if 'frame=' in line:
+                log.debug(line)
+                if progress_callback is not None:
+                    try:
+                        progress_callback(int(line.split('frame=')[1].split()[0]))
+                    except (ValueError, IndexError):
+                        pass
+            elif line:
+                stderr_tail.append(line)
+                del stderr_tail[:-20]
+        proc.stderr.close()
+
+    drain = threading.Thread(target=_drain_stderr, name='FFmpegStderr',
+                             daemon=True)
+    drain.start()
+
+    try:
+        for payload in frames:
+            proc.stdin.write(payload)
+        proc.stdin.close()
+        rc = proc.wait()
+    except BrokenPipeError:
+        log.error("ffmpeg closed the pipe early; encode failed.")
+        proc.wait()
+        return False
+    except Exception as e:
+        log.error(f"Error streaming frames to ffmpeg: {e}", exc_info=True)
+        proc.kill()
+        proc.wait()
+        return False
+
+    drain.join(timeout=5)
+    if rc != 0:
+        log.error(f"ffmpeg failed with exit code {rc}: "
+                  + ' | '.join(stderr_tail[-5:]))
+        return False
+    log.info(f"Timelapse assembled: {output_path}")
+    return True
+
+
+def _decode_frame_job(args):
+    """
+    Top-level (picklable) worker: decodes one RAW frame with the shared
+    settings and returns (width, height, rgb24 bytes), resized to size when
+    one is given. Returns None on failure so the consumer can skip the
+    frame without killing the stream.
+    """
+    input_path, size, settings = args
+    try:
+        brightness = settings.get('brightness', 1.0)
+        needs_linear = brightness != 1.0
+        rgb = _process_raw_file(input_path,
+                                settings.get('white_balance', 'camera'),
+                                settings.get('temperature', 0.0),
+                                settings.get('tint', 0.0),
+                                settings.get('fast_demosaic', True),
+                                needs_linear)
+        if needs_linear:
+            rgb = np.clip(rgb.astype(np.int32) * brightness,
+                          0, 65535).astype(np.uint16)
+            rgb = _gamma_lut()[rgb]
+        image = _apply_bcs(Image.fromarray(rgb), 1.0,
+                           settings.get('contrast', 1.0),
+                           settings.get('saturation', 1.0))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        if size is not None and image.size != size:
+            image = image.resize(size)
+        return image.width, image.height, np.asarray(image, dtype=np.uint8).tobytes()
+    except Exception as e:
+        log.error(f"Failed to decode frame '{input_path}': {e}", exc_info=True)
+        return None
+
+
+def process_timelapse_sequence(timelapse_folder, output_path, settings=None,
+                               fps=30, codec_settings=None,
+                               progress_callback=None):
+    """
+    Full pipeline: decodes every RAW frame in timelapse_folder on a process
+    pool and streams the results straight into ffmpeg's stdin, in order.
+    Compared to the old stage-to-JPEG flow this skips one JPEG encode and
+    one JPEG decode per frame plus all the temp-dir disk traffic; the
+    decode pool keeps a bounded window of frames in flight so workers run
+    ahead of the encoder without holding the whole sequence in memory.
+    Returns True on success.
+    """
+    # One directory pass with a set lookup per name, instead of one glob
+    # (each its own full scan) per extension and case variant
+    try:
+        with os.scandir(timelapse_folder) as entries:
+            image_files = sorted(
+                (entry.path for entry in entries
+                 if os.path.splitext(entry.name)[1].lower() in _RAW_EXTS),
+                key=lambda path: _natkey(os.path.basename(path)))
+    except OSError as e:
+        log.error(f"Could not read timelapse folder '{timelapse_folder}': {e}")
+        return False
+    if not image_files:
+        log.error(f"No RAW frames found in {timelapse_folder}")
+        return False
+
+    # Fail fast on misconfiguration: a bad codec name or an unwritable
+    # output directory should surface now, not after minutes of decoding
+    error = _validate_codec_settings(codec_settings)
+    if error:
+        log.error(error)
+        return False
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+
+    settings = dict(settings or {})
+    settings.setdefault('fast_demosaic', True)
+
+    # First frame decodes in-process to fix the stream geometry
+    first = _decode_frame_job((image_files[0], None, settings))
+    if first is None:
+        log.error("Could not decode the first frame; aborting assembly.")
+        return False
+    width, height, first_payload = first
+    size = (width, height)
+
+    os.environ.setdefault('OMP_NUM_THREADS', '1')
+    max_workers = os.cpu_count() or 1
+    failed = [0]
+
+    def _frames():
+        yield first_payload
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            # Submission window of ~2x core count: enough completed-but-
+            # unwritten frames to absorb out-of-order finishes, small enough
+            # that memory stays bounded when the encoder is the bottleneck
+            remaining = iter(image_files[1:])
+            pending = collections.deque()
+            for path in itertools.islice(remaining, max_workers * 2):
+                pending.append(pool.submit(_decode_frame_job,
+                                           (path, size, settings)))
+            while pending:
+                result = pending.popleft().result()
+                for path in itertools.islice(remaining, 1):
+                    pending.append(pool.submit(_decode_frame_job,
+                                               (path, size, settings)))
+                if result is None:
+                    failed[0] += 1
+                    continue
+                yield result[2]
+
+    ok = _stream_to_ffmpeg(
+        _build_ffmpeg_cmd(width, height, fps, codec_settings, output_path),
+        _frames(), output_path, progress_callback)
+    if failed[0]:
+        log.warning(f"{failed[0]} frame(s) failed to decode and were skipped.")
+    return ok
@@ -0,0 +1,503 @@
+import collections
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+# Optional C conversion pipelines for frame-to-JPEG work; both decode and
+# encode without surfacing pixel data to Python
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# C JSON codec for project files; also serializes numpy scalars that
+# sneak in via EXIF metadata, which stdlib json would choke on
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fast non-cryptographic hash for batch-edit change detection; hashing a
+# frame is orders of magnitude cheaper than re-editing it
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from .image_editor import _RAW_EXTS, ImageEditor
+from .raw import _build_ffmpeg_cmd, _process_raw_file, _stream_to_ffmpeg
+from .utils import _downscale_filter, _fast_copy, get_image_metadata
+
+log = logging.getLogger(__name__)
+
+# Frame extensions (no dot, lowercase) recognized when scanning a sequence
+EXT_SET = frozenset({'jpg', 'jpeg', 'png', 'tif', 'tiff', 'arw', 'cr2', 'nef'})
+
+# Capture-date prefix of a sequence folder name (YYYYMMDD_HHMMSS)
+_DATE_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})')
+
+
+def _load_frame_rgb(frame_path, draft_size=None):
+    """
+    Decodes one frame (RAW or regular image) to an RGB image. With
+    draft_size, JPEG decoding happens at the nearest 1/2-1/8 DCT scale
+    toward that size (a no-op when it isn't smaller than the source).
+    """
+    if os.path.splitext(frame_path)[1].lower() in _RAW_EXTS:
+        return Image.fromarray(_process_raw_file(frame_path, linear_16bit=False))
+    with Image.open(frame_path) as img:
+        if draft_size is not None:
+            img.draft('RGB', draft_size)
+        return img.convert('RGB')
+
+
+def _convert_frame_to_jpeg(src, dst, quality=90):
+    """
+    Converts one frame file to JPEG through the fastest pipeline that can
+    read it: pyvips (sequential access — streams the image without a full
+    in-memory decode), then OpenCV, then ImageEditor, which is the one
+    that always understands camera RAW. Returns True on success.
+    """
+    if pyvips is not None:
+        try:
+            pyvips.Image.new_from_file(src, access='sequential').jpegsave(
+                dst, Q=quality)
+            return True
+        except Exception:
+            pass
+    if cv2 is not None:
+        img = cv2.imread(src)
+        if img is not None:
+            cv2.imwrite(dst, img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+            return True
+    try:
+        ImageEditor(src).save(dst, format='JPEG', quality=quality)
+        return True
+    except Exception as e:
+        log.error(f"Failed to convert '{src}': {e}", exc_info=True)
+        return False
+
+
+def _frame_payload_job(args):
+    """
+    Top-level (picklable) worker: decodes one frame and returns its rgb24
+    bytes at the stream geometry, or None on failure so the consumer can
+    skip it.
+    """
+    frame_path, size = args
+    try:
+        img = _load_frame_rgb(frame_path, size)
+        if img.size != size:
+            img = img.resize(size)
+        return np.asarray(img, dtype=np.uint8).tobytes()
+    except Exception as e:
+        log.error(f"Failed to decode frame '{frame_path}': {e}", exc_info=True)
+        return None
+
+
+def _frame_digest(frame_path, params_hash):
+    """Returns the xxh3 hash of a frame's bytes combined with params_hash."""
+    h = xxhash.xxh3_64()
+    with open(frame_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return f'{h.hexdigest()}:{params_hash}'
+
+
+def _edit_one(args):
+    """
+    Top-level (picklable) worker: applies one set of edit params to one
+    frame and saves the result. When a params hash is given, a sidecar
+    .hash file next to the output lets unchanged frames skip the whole
+    decode/edit/encode round-trip on re-runs. Returns True on success.
+    """
+    frame_path, output_path, edit_params, params_hash = args
+    digest = None
+    if params_hash is not None:
+        sidecar = output_path + '.hash'
+        try:
+            digest = _frame_digest(frame_path, params_hash)
+            if os.path.exists(output_path):
+                with open(sidecar) as f:
+                    if f.read() == digest:
+                        return True
+        except OSError:
+            pass
+    try:
+        editor = ImageEditor(frame_path)
+        if 'crop' in edit_params:
+            editor.crop(tuple(edit_params['crop']))
+        if 'brightness' in edit_params:
+            editor.adjust_brightness(edit_params['brightness'])
+        if 'contrast' in edit_params:
+            editor.adjust_contrast(edit_params['contrast'])
+        if 'saturation' in edit_params:
+            editor.adjust_saturation(edit_params['saturation'])
+        if 'rotate' in edit_params:
+            editor.rotate(edit_params['rotate'])
+        if 'resize' in edit_params:
+            editor.resize(tuple(edit_params['resize']))
+        if 'filter' in edit_params:
+            editor.apply_filter(edit_params['filter'])
+        editor.save(output_path, quality=edit_params.get('quality', 95))
+        if digest is not None:
+            with open(sidecar, 'w') as f:
+                f.write(digest)
+        return True
+    except Exception as e:
+        log.error(f"Failed to edit frame '{frame_path}': {e}", exc_info=True)
+        return False
+
+
+class TimelapseEditor:
+    """
+    Edits a captured timelapse sequence: per-frame adjustments, sampled
+    previews, frame extraction, and assembly into a video. A sequence is a
+    folder of frames named by the capture code (typically
+    YYYYMMDD_HHMMSS_<n>); edits are described by a plain edit_params dict
+    so they can be stored in a project file and replayed.
+    """
+
+    def __init__(self, sequence_path):
+        self.sequence_path = sequence_path
+        self.frames = []
+        self._scan_sequence()
+        self.capture_date = self._extract_date_from_folder_name()
+        log.info(f"Loaded sequence '{sequence_path}' with {self.frame_count} frames")
+
+    @property
+    def frame_count(self):
+        return len(self.frames)
+
+    def _scan_sequence(self):
+        """Finds and orders the image files that make up the sequence."""
+        # One scandir pass: DirEntry caches file-vs-dir from the directory
+        # read itself, so no per-name stat, and rpartition is one C-level
+        # string op against the module extension set
+        with os.scandir(self.sequence_path) as entries:
+            found = [e for e in entries
+                     if e.is_file(follow_symlinks=False)
+                     and e.name.rpartition('.')[2].lower() in EXT_SET]
+        found.sort(key=lambda e: e.name)
+        self.frames = [e.path for e in found]
+
+    def _extract_date_from_folder_name(self):
+        """Parses the capture date out of the sequence folder name, if present."""
+        folder = os.path.basename(os.path.normpath(self.sequence_path))
+        match = _DATE_RE.match(folder)
+        if not match:
+            return None
+        try:
+            # Direct construction skips strptime's per-call format parse
+            # and locale machinery
+            return datetime(*map(int, match.groups()))
+        except ValueError:
+            return None
+
+    def get_frame_path(self, index):
+        """Returns the path of the frame at index, or None if out of range."""
+        if 0 <= index < len(self.frames):
+            return self.frames[index]
+        return None
+
+    def get_frame_preview(self, index, max_size=1024):
+        """Returns a downscaled PIL preview of one frame, or None on failure."""
+        frame_path = self.get_frame_path(index)
+        if frame_path is None:
+            return None
+        try:
+            if os.path.splitext(frame_path)[1].lower() in _RAW_EXTS:
+                # RAW goes through the editor's half-size LibRaw decode
+                editor = ImageEditor(frame_path)
+                return editor.get_preview(max_size)
+            # Plain images skip ImageEditor entirely: draft() lets libjpeg
+            # decode at 1/2-1/8 scale natively (16x less pixel work for a
+            # small preview of a 24 MP JPEG), thumbnail finishes the job
+            img = Image.open(frame_path)
+            img.draft('RGB', (max_size, max_size))
+            # After draft() the leftover downscale is mild for JPEGs but
+            # can still be 10x+ for PNG/TIFF frames; match the filter to it
+            scale = max_size / max(img.size)
+            img.thumbnail((max_size, max_size), _downscale_filter(scale))
+            return img
+        except Exception as e:
+            log.error(f"Failed to preview frame '{frame_path}': {e}", exc_info=True)
+            return None
+
+    def generate_sequence_preview(self, output_dir, sample_interval=10,
+                                  max_size=640):
+        """
+        Saves a downscaled JPEG preview of every sample_interval-th frame
+        into output_dir and returns the list of written paths.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        def _one(index):
+            preview = self.get_frame_preview(index, max_size)
+            if preview is None:
+                return None
+            out_path = os.path.join(output_dir, f'preview_{index:05d}.jpg')
+            if preview.mode != 'RGB':
+                preview = preview.convert('RGB')
+            preview.save(out_path, 'JPEG', quality=80)
+            return out_path
+
+        # Threads rather than processes: libjpeg releases the GIL during
+        # decode/encode and each worker holds only one small preview, so
+        # this scales with cores at no extra memory cost
+        workers = min(16, (os.cpu_count() or 1) * 2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_one, range(0, self.frame_count, sample_interval))
+        return [path for path in results if path is not None]
+
+    def batch_edit_frames(self, output_dir, edit_params, max_workers=None):
+        """
+        Applies edit_params to every frame, writing results into output_dir.
+        Each frame is an independent decode/edit/encode round-trip, so the
+        work fans out over a process pool (threads would serialize on the
+        GIL for the pixel math) and scales near-linearly with cores.
+        Returns a dict with 'successful', 'failed' and per-file results.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        # One hash covers the edit params for the whole run; each worker
+        # combines it with its frame's content hash to decide whether the
+        # existing output is already up to date
+        params_hash = None
+        if xxhash is not None:
+            params_hash = xxhash.xxh3_64_hexdigest(
+                json.dumps(edit_params, sort_keys=True).encode())
+        tasks = []
+        for frame_path in self.frames:
+            base = os.path.splitext(os.path.basename(frame_path))[0]
+            tasks.append((frame_path, os.path.join(output_dir, base + '.jpg'),
+                          edit_params, params_hash))
+
+        results = {'successful': 0, 'failed': 0, 'progress': 0, 'files': []}
+        if not tasks:
+            return results
+
+        max_workers = max_workers or os.cpu_count()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for i, ok in enumerate(pool.map(_edit_one, tasks, chunksize=4)):
+                if ok:
+                    results['successful'] += 1
+                    results['files'].append(tasks[i][1])
+                else:
+                    results['failed'] += 1
+                results['progress'] = int(100 * (i + 1) / len(tasks))
+        return results
+
+    def assemble_video(self, output_path, fps=30, codec_settings=None,
+                       frames_dir=None, edit_params=None):
+        """
+        Assembles the sequence (or a folder of pre-edited frames) into a
+        video by decoding each frame once in Python and piping raw RGB
+        straight into ffmpeg's stdin — no temp staging dir, no extra JPEG
+        encode/decode round-trip, no sequence-sized disk writes. Encoder
+        selection and threading come from the shared ffmpeg helpers.
+        Returns True on success.
+        """
+        if frames_dir:
+            with os.scandir(frames_dir) as entries:
+                frames = sorted(e.path for e in entries
+                                if e.name.lower().endswith(('.jpg', '.jpeg')))
+        else:
+            frames = self.frames
+        if not frames:
+            log.error("No frames to assemble.")
+            return False
+
+        # A plain resize is done in Python during decode (draft() makes
+        # libjpeg decode toward the target scale natively), so no scale
+        # filter and no full-size frames over the pipe. Crop boxes are in
+        # source coordinates, so a crop keeps full-size frames and does
+        # both steps in ffmpeg's filter graph.
+        vf = []
+        target = None
+        edit_params = edit_params or {}
+        crop = edit_params.get('crop')
+        resize = edit_params.get('resize')
+        if crop:
+            vf.append(f'crop={crop[2] - crop[0]}:{crop[3] - crop[1]}'
+                      f':{crop[0]}:{crop[1]}')
+            if resize:
+                vf.append(f'scale={resize[0]}:{resize[1]}')
+        elif resize:
+            target = tuple(resize)
+
+        # Untouched all-JPEG sequences don't need Python in the pixel path
+        # at all: hand ffmpeg the file list and let its own JPEG decoder
+        # run inline with the encode
+        if not vf and target is None and all(
+                f.lower().endswith(('.jpg', '.jpeg')) for f in frames):
+            return self._assemble_from_jpegs(frames, output_path, fps,
+                                             codec_settings)
+
+        try:
+            first = _load_frame_rgb(frames[0], target)
+            if target is not None and first.size != target:
+                first = first.resize(target)
+        except Exception as e:
+            log.error(f"Could not decode first frame '{frames[0]}': {e}",
+                      exc_info=True)
+            return False
+        width, height = first.size
+
+        cmd = _build_ffmpeg_cmd(width, height, fps, codec_settings, output_path)
+        if vf:
+            cmd[-1:-1] = ['-vf', ','.join(vf)]
+
+        os.environ.setdefault('OMP_NUM_THREADS', '1')
+        max_workers = os.cpu_count() or 1
+        size = (width, height)
+
+        def _frames():
+            yield np.asarray(first, dtype=np.uint8).tobytes()
+            # Same bounded-window pool as the RAW sequence pipeline:
+            # decode runs max_workers frames ahead of the encoder, in
+            # submission order, without holding the sequence in memory
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+                remaining = iter(frames[1:])
+                pending = collections.deque()
+                for frame_path in itertools.islice(remaining, max_workers * 2):
+                    pending.append(pool.submit(_frame_payload_job,
+                                               (frame_path, size)))
+                while pending:
+                    payload = pending.popleft().result()
+                    for frame_path in itertools.islice(remaining, 1):
+                        pending.append(pool.submit(_frame_payload_job,
+                                                   (frame_path, size)))
+                    if payload is not None:
+                        yield payload
+
+        return _stream_to_ffmpeg(cmd, _frames(), output_path)
+
+    def _assemble_from_jpegs(self, frames, output_path, fps, codec_settings):
+        """
+        Encodes an unedited all-JPEG sequence through ffmpeg's concat
+        demuxer: the input is a few KB of list file rather than gigabytes
+        of raw RGB decoded and piped from Python. Returns True on success.
+        """
+        fd, list_path = tempfile.mkstemp(suffix='.txt', prefix='timelapse_concat_')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                for frame in frames:
+                    escaped = frame.replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            # Shared builder keeps the output side (encoder pick, threading,
+            # quality flags); only the rawvideo-on-stdin input is swapped
+            # for the concat list
+            cmd = _build_ffmpeg_cmd(0, 0, fps, codec_settings, output_path)
+            cmd[2:cmd.index('-i') + 2] = ['-f', 'concat', '-safe', '0',
+                                          '-r', str(fps), '-i', list_path]
+            return _stream_to_ffmpeg(cmd, (), output_path)
+        finally:
+            try:
+                os.remove(list_path)
+            except OSError:
+                pass
+
+    def extract_frame(self, index, output_path):
+        """Exports a single frame to output_path (JPEGs are copied as-is)."""
+        frame_path = self.get_frame_path(index)
+        if frame_path is None:
+            return False
+        try:
+            if (frame_path.lower().endswith(('.jpg', '.jpeg'))
+                    and output_path.lower().endswith(('.jpg', '.jpeg'))):
+                _fast_copy(frame_path, output_path)
+                return True
+            if output_path.lower().endswith(('.jpg', '.jpeg')):
+                return _convert_frame_to_jpeg(frame_path, output_path,
+                                              quality=95)
+            editor = ImageEditor(frame_path)
+            editor.save(output_path)
+            return True
+        except Exception as e:
+            log.error(f"Failed to extract frame '{frame_path}': {e}", exc_info=True)
+            return False
+
+    def save_project(self, output_path, edit_params=None):
+        """
+        Saves the sequence reference and edit settings as a project file.
+        The frame list and the sequence directory's mtime go in too, so
+        load_project can reopen the project without rescanning the folder.
+        """
+        try:
+            dir_mtime = os.stat(self.sequence_path).st_mtime
+        except OSError:
+            dir_mtime = None
+        project_data = {
+            'sequence_path': self.sequence_path,
+            'frame_count': self.frame_count,
+            'frames': self.frames,
+            'dir_mtime': dir_mtime,
+            'capture_date': (self.capture_date.isoformat()
+                             if self.capture_date else None),
+            'edit_params': edit_params or {},
+            'first_frame_metadata': (get_image_metadata(self.frames[0])
+                                     if self.frames else {}),
+        }
+        try:
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(
+                        project_data,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(output_path, 'w') as f:
+                    json.dump(project_data, f, indent=2)
+            return True
+        except (OSError, TypeError) as e:
+            log.error(f"Failed to save project '{output_path}': {e}")
+            return False
+
+    @classmethod
+    def load_project(cls, project_path):
+        """
+        Loads a project file and returns (editor, edit_params), or
+        (None, None) if the project or its sequence is unavailable.
+        """
+        try:
+            with open(project_path, 'rb') as f:
+                raw = f.read()
+            project_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            sequence_path = project_data['sequence_path']
+            editor = None
+            frames = project_data.get('frames')
+            dir_mtime = project_data.get('dir_mtime')
+            if frames and dir_mtime is not None:
+                try:
+                    # Directory untouched since the project was saved:
+                    # restore the frame index from the file and skip the
+                    # O(frames) rescan entirely
+                    if os.stat(sequence_path).st_mtime == dir_mtime:
+                        editor = cls.__new__(cls)
+                        editor.sequence_path = sequence_path
+                        editor.frames = list(frames)
+                        capture_date = project_data.get('capture_date')
+                        editor.capture_date = (datetime.fromisoformat(capture_date)
+                                               if capture_date else None)
+                        log.info(f"Loaded sequence '{sequence_path}' from "
+                                 f"project index ({editor.frame_count} frames)")
+                except OSError:
+                    editor = None
+            if editor is None:
+                editor = cls(sequence_path)
+            return editor, project_data.get('edit_params', {})
+        except (OSError, KeyError, ValueError) as e:
+            log.error(f"Failed to load project '{project_path}': {e}")
+            return None, None
@@ -0,0 +1,147 @@
+import logging
+import os
+import shutil
+
+# Optional EXIF parser that works on a raw header buffer, no image decode
+try:
+    import piexif
+except ImportError:
+    piexif = None
+
+log = logging.getLogger(__name__)
+
+# SOFn markers that carry frame dimensions (C4/C8/CC are not frame headers)
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _parse_jpeg_header(buf):
+    """
+    Walks the JPEG marker segments in a header buffer and returns
+    (width, height) from the first SOFn frame header, or None if the
+    buffer doesn't reach it.
+    """
+    i = 2
+    n = len(buf)
+    while i + 9 < n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker in _SOF_MARKERS:
+            height = int.from_bytes(buf[i + 5:i + 7], 'big')
+            width = int.from_bytes(buf[i + 7:i + 9], 'big')
+            return width, height
+        if 0xD0 <= marker <= 0xD9:
+            # Standalone markers (RST/SOI/EOI) carry no length field
+            i += 2
+            continue
+        i += 2 + int.from_bytes(buf[i + 2:i + 4], 'big')
+    return None
+
+
+def _fast_copy(src, dst):
+    """
+    Copies src to dst in-kernel when the platform allows it:
+    os.copy_file_range first (one syscall per chunk, and metadata-only on
+    reflink filesystems like btrfs/XFS), then os.sendfile, then a plain
+    shutil.copy2. Skipping the 64 KB userspace bounce buffers matters when
+    staging thousands of multi-MB frames.
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            copied = 0
+            while copied < size:
+                if hasattr(os, 'copy_file_range'):
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                              size - copied)
+                else:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(),
+                                       copied, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        if copied == size:
+            shutil.copystat(src, dst)
+            return dst
+    except (AttributeError, OSError):
+        pass
+    return shutil.copy2(src, dst)
+
+
+def get_image_metadata(image_path):
+    """
+    Returns basic metadata for an image file: dimensions, format, mode and
+    EXIF tags when present. Returns an empty dict on failure.
+
+    JPEGs are answered from the first 64 KB of the file — dimensions from
+    the SOFn marker, EXIF via piexif on the same buffer — so frequent
+    callers (project files, sequence scans) never pay for a full decode.
+    """
+    if image_path.lower().endswith(('.jpg', '.jpeg')):
+        try:
+            with open(image_path, 'rb') as f:
+                buf = f.read(65536)
+            if buf[:2] == b'\xff\xd8':
+                dims = _parse_jpeg_header(buf)
+                if dims is not None:
+                    metadata = {
+                        'width': dims[0],
+                        'height': dims[1],
+                        'format': 'JPEG',
+                        'mode': 'RGB',
+                    }
+                    if piexif is not None:
+                        try:
+                            exif_dict = piexif.load(buf)
+                            exif = {
+                                str(tag): str(value)
+                                for ifd in ('0th', 'Exif')
+                                for tag, value in (exif_dict.get(ifd) or {}).items()
+                            }
+                            if exif:
+                                metadata['exif'] = exif
+                        except Exception:
+                            pass
+                    return metadata
+        except OSError as e:
+            log.error(f"Failed to read metadata from '{image_path}': {e}")
+            return {}
+
+    from PIL import Image
+    try:
+        with Image.open(image_path) as img:
+            metadata = {
+                'width': img.width,
+                'height': img.height,
+                'format': img.format,
+                'mode': img.mode,
+            }
+            exif = img._getexif() if hasattr(img, '_getexif') else None
+            if exif:
+                metadata['exif'] = {str(k): str(v) for k, v in exif.items()}
+            return metadata
+    except Exception as e:
+        log.error(f"Failed to read metadata from '{image_path}': {e}")
+        return {}
+
+
+def _downscale_filter(scale):
+    """
+    Picks the cheapest resample filter that still looks right for a given
+    downscale ratio. Past 4x reduction the 8-tap Lanczos kernel is visually
+    indistinguishable from box averaging but does ~8x the multiplies.
+    """
+    from PIL import Image
+    if scale < 0.25:
+        return Image.BOX
+    if scale < 0.5:
+        return Image.BILINEAR
+    return Image.LANCZOS
+
+
+def resize_image(image, size):
+    """Returns a copy of a PIL image downscaled to fit within size."""
+    scale = min(size[0] / image.width, size[1] / image.height)
+    resized = image.copy()
+    resized.thumbnail(size, _downscale_filter(scale))
+    return resized
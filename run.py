@@ -4,6 +4,8 @@ Main entry point for the Remote Camera Controller application.
 Initializes and runs the Flask application.
 """
 import logging
+import logging.handlers
+import queue
 from app import create_app
 from app.config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG
 
@@ -12,6 +14,18 @@ logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s'
 )
+
+# Route all records through a queue drained by a dedicated listener thread,
+# so the preview/timelapse worker threads never block on the actual
+# console/disk write while holding their capture timing
+_log_queue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, *_root_logger.handlers, respect_handler_level=True
+)
+_root_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+_log_listener.start()
+
 logger = logging.getLogger(__name__)
 
 # Create the Flask application